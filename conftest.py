@@ -0,0 +1,9 @@
+import pytest
+
+from core.test_runner import isolated_shared_cache
+
+
+@pytest.fixture(autouse=True, scope='session')
+def shared_cache():
+    with isolated_shared_cache():
+        yield
@@ -1,5 +1,32 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+# Настройки кешей, которые обязаны быть общими для всех процессов.
+SHARED_CACHE_SETTINGS = (
+    'AUTH_USER_CACHE', 'FEED_VERSION_CACHE', 'GROUP_REGISTRY_CACHE',
+    'POST_CARD_CACHE', 'SESSION_CACHE_ALIAS', 'THROTTLE_CACHE',
+)
+
+
+def check_shared_caches():
+    for name in SHARED_CACHE_SETTINGS:
+        alias = getattr(settings, name)
+        backend = import_string(settings.CACHES[alias]['BACKEND'])
+        if issubclass(backend, LocMemCache):
+            raise ImproperlyConfigured(
+                f'{name}: кеш {alias!r} живёт в памяти одного процесса, '
+                'нужен общий для всех процессов.')
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import auth  # noqa: F401
+        check_shared_caches()
+        if settings.TEMPLATE_PRELOAD:
+            from .template_cache import preload_templates
+            preload_templates()
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+User = auth.get_user_model()
+
+
+def user_cache_key(user_id, session_hash):
+    return f'auth_user:{user_id}:{session_hash}'
+
+
+def session_hash(password):
+    """Версия пароля, которую Django хранит в сессии пользователя."""
+    return User(password=password).get_session_auth_hash()
+
+
+def get_cached_user(request):
+    """Пользователь сессии из кеша, как django.contrib.auth.get_user.
+
+    Ключ кеша — id пользователя и версия его пароля из сессии, поэтому
+    после смены пароля старые сессии в кеш не попадают, а проверку
+    версии на промахе выполняет сам Django.
+    """
+    try:
+        user_id = auth._get_user_session_key(request)
+        backend_path = request.session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    version = request.session.get(HASH_SESSION_KEY)
+    if backend_path not in settings.AUTHENTICATION_BACKENDS or not version:
+        return auth.get_user(request)
+    cache = caches[settings.AUTH_USER_CACHE]
+    key = user_cache_key(user_id, version)
+    user = cache.get(key)
+    if user is None and getattr(request.session, 'from_front_cache', False):
+        # Кеш процесса мог отстать от общего: после смены пароля
+        # в другом процессе в нём прежняя версия, и Django сбросил бы
+        # уже обновлённую сессию. Проверяем по свежей копии.
+        request.session.reload()
+        return get_cached_user(request)
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+    return user
+
+
+def forget_user(user, *passwords):
+    """Убирает пользователя из кеша для текущего и прежних паролей."""
+    versions = {session_hash(password)
+                for password in (user.password, *passwords) if password}
+    caches[settings.AUTH_USER_CACHE].delete_many(
+        [user_cache_key(user.pk, version) for version in versions])
+
+
+@receiver(post_init, sender=User)
+def remember_password(sender, instance, **kwargs):
+    """Запоминает загруженный пароль, чтобы при сохранении сбросить
+    кеш и для прежней его версии.
+    """
+    if 'password' in instance.__dict__:
+        instance._loaded_password = instance.__dict__['password']
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    forget_user(instance, getattr(instance, '_loaded_password', None))
+    instance._loaded_password = instance.password
@@ -0,0 +1,107 @@
+"""Бэкенд SQLite для боевой нагрузки.
+
+Каждое соединение включает WAL и настраивает PRAGMA из DEFAULT_PRAGMAS
+(их можно переопределить ключом OPTIONS['pragmas']). Все записи
+процесса проходят через один замок на файл базы: транзакции
+открываются BEGIN IMMEDIATE под замком, одиночные записи вне
+транзакции берут его на время запроса. Конкурирующие записи встают
+в очередь, а не падают с «database is locked».
+"""
+import threading
+
+from django.db import OperationalError
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+}
+READ_PREFIXES = ('SELECT', 'WITH', 'PRAGMA', 'EXPLAIN')
+
+_writer_locks = {}
+_writer_locks_guard = threading.Lock()
+
+
+def writer_lock(name):
+    """Общий для процесса замок записи в файл базы name."""
+    with _writer_locks_guard:
+        return _writer_locks.setdefault(name, threading.Lock())
+
+
+def is_write(sql):
+    return not sql.lstrip().upper().startswith(READ_PREFIXES)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pragmas = {
+            **DEFAULT_PRAGMAS,
+            **self.settings_dict['OPTIONS'].get('pragmas', {}),
+        }
+        self.writer_lock = writer_lock(self.settings_dict['NAME'])
+        self.holds_writer_lock = False
+        self.execute_wrappers.append(self._serialize_write)
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def acquire_writer_lock(self):
+        timeout = self.pragmas['busy_timeout'] / 1000
+        if not self.writer_lock.acquire(timeout=timeout):
+            raise OperationalError('database is locked')
+        self.holds_writer_lock = True
+
+    def release_writer_lock(self):
+        if self.holds_writer_lock:
+            self.holds_writer_lock = False
+            self.writer_lock.release()
+
+    def _serialize_write(self, execute, sql, params, many, context):
+        if self.holds_writer_lock or not is_write(sql):
+            return execute(sql, params, many, context)
+        self.acquire_writer_lock()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.release_writer_lock()
+
+    def _start_transaction_under_autocommit(self):
+        # Транзакция сразу берёт блокировку записи: отложенный BEGIN,
+        # который позже повышается до записи, в WAL падает с
+        # SQLITE_BUSY без ожидания busy_timeout.
+        self.acquire_writer_lock()
+        try:
+            self.cursor().execute('BEGIN IMMEDIATE')
+        except Exception:
+            self.release_writer_lock()
+            raise
+
+    def _commit(self):
+        try:
+            super()._commit()
+        finally:
+            self.release_writer_lock()
+
+    def _rollback(self):
+        try:
+            super()._rollback()
+        finally:
+            self.release_writer_lock()
+
+    def _close(self):
+        try:
+            super()._close()
+        finally:
+            self.release_writer_lock()
@@ -0,0 +1,61 @@
+import threading
+
+from django.conf import settings
+
+_state = threading.local()
+
+
+def start_request():
+    _state.replica = False
+    _state.wrote = False
+
+
+def finish_request():
+    """Сбрасывает состояние запроса; True, если запрос писал в базу."""
+    wrote = getattr(_state, 'wrote', False)
+    start_request()
+    return wrote
+
+
+def read_from_replica():
+    """Направляет чтения до конца запроса на реплику."""
+    _state.replica = True
+
+
+def primary_only(model):
+    return model._meta.app_label in settings.REPLICA_PRIMARY_APPS
+
+
+class ReplicaRouter:
+    """Чтения страниц из REPLICA_VIEWS идут на реплику, всё остальное
+    и любые записи — на основную базу.
+
+    Модели из REPLICA_PRIMARY_APPS (сессии, пользователи) всегда
+    читаются с основной базы: их пишут попутно, например при входе,
+    и сразу перечитывают. Такие записи не считаются записью запроса
+    и не закрепляют пользователя за основной базой.
+
+    Без настроенной REPLICA_DATABASE роутер ничего не меняет.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            settings.REPLICA_DATABASE
+            and getattr(_state, 'replica', False)
+            and not primary_only(model)
+        ):
+            return settings.REPLICA_DATABASE
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        if not primary_only(model):
+            _state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if settings.REPLICA_DATABASE and db == settings.REPLICA_DATABASE:
+            return False
+        return None
@@ -0,0 +1,270 @@
+import logging
+import os
+import pickle
+import queue
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MailSpool:
+    """Каталог с письмами, которые ещё не доставлены.
+
+    Каждое письмо лежит в своём файле <id>.<pid>.msg, где pid —
+    процесс, который его отправляет. Письма, от которых отказались
+    после всех попыток, переносятся в подкаталог failed.
+    """
+
+    suffix = '.msg'
+
+    def __init__(self, path):
+        self.path = path
+        self.failed_path = os.path.join(path, 'failed')
+        os.makedirs(self.failed_path, exist_ok=True)
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def write(self, record, name=None):
+        """Атомарно сохраняет запись и возвращает имя её файла."""
+        if name is None:
+            name = f'{uuid.uuid4().hex}.{os.getpid()}{self.suffix}'
+        temp = self._file(f'.{name}.tmp')
+        with open(temp, 'wb') as spool_file:
+            pickle.dump(record, spool_file)
+            spool_file.flush()
+            os.fsync(spool_file.fileno())
+        os.replace(temp, self._file(name))
+        return name
+
+    def read(self, name):
+        with open(self._file(name), 'rb') as spool_file:
+            return pickle.load(spool_file)
+
+    def remove(self, name):
+        os.remove(self._file(name))
+
+    def fail(self, name):
+        os.replace(self._file(name), os.path.join(self.failed_path, name))
+
+    def adopt(self):
+        """Забирает письма, оставшиеся от остановленных процессов.
+
+        Своими считаются и файлы с pid текущего процесса: при запуске
+        в контейнере новый процесс часто получает тот же pid.
+        """
+        own_pid = os.getpid()
+        adopted = []
+        for name in sorted(os.listdir(self.path)):
+            if not name.endswith(self.suffix):
+                continue
+            message_id, _, pid = name[:-len(self.suffix)].partition('.')
+            try:
+                pid = int(pid)
+            except ValueError:
+                continue
+            if pid != own_pid and _pid_alive(pid):
+                continue
+            new_name = f'{message_id}.{own_pid}{self.suffix}'
+            try:
+                os.replace(self._file(name), self._file(new_name))
+            except FileNotFoundError:
+                continue
+            adopted.append(new_name)
+        return adopted
+
+
+class MailQueue:
+    """Очередь писем с фоновым потоком доставки.
+
+    Поток забирает из очереди всё, что накопилось (до
+    QUEUED_EMAIL_BATCH_SIZE писем), и отправляет пачку через одно
+    соединение бэкенда QUEUED_EMAIL_BACKEND. Неудачные письма
+    повторяются с удваивающейся паузой, не больше
+    QUEUED_EMAIL_MAX_RETRIES раз.
+    """
+
+    def __init__(self, spool_path):
+        self.pid = os.getpid()
+        self.spool = MailSpool(spool_path)
+        self.queue = queue.Queue()
+        self.pending = 0
+        self.idle = threading.Condition()
+        adopted = self.spool.adopt()
+        if adopted:
+            self.enqueue(adopted)
+        self.thread = threading.Thread(
+            target=self.run, name='mail-queue', daemon=True)
+        self.thread.start()
+
+    def alive(self):
+        """Работает ли поток доставки в этом процессе.
+
+        После fork (например, gunicorn --preload) у рабочего процесса
+        остаётся очередь родителя, но не её поток.
+        """
+        return self.pid == os.getpid() and self.thread.is_alive()
+
+    def put(self, messages):
+        """Сохраняет письма в спул и ставит их в очередь одной пачкой."""
+        names = []
+        for message in messages:
+            # Соединение отправителя не сериализуется и потоку не нужно.
+            message.connection = None
+            names.append(self.spool.write({'message': message,
+                                           'attempts': 0}))
+        self.enqueue(names)
+
+    def enqueue(self, names):
+        with self.idle:
+            self.pending += len(names)
+        self.queue.put(names)
+
+    def done(self):
+        with self.idle:
+            self.pending -= 1
+            if not self.pending:
+                self.idle.notify_all()
+
+    def flush(self, timeout=None):
+        """Ждёт, пока все письма будут доставлены или отброшены."""
+        with self.idle:
+            return self.idle.wait_for(lambda: not self.pending, timeout)
+
+    def next_batch(self):
+        batch = list(self.queue.get())
+        while len(batch) < settings.QUEUED_EMAIL_BATCH_SIZE:
+            try:
+                batch.extend(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.next_batch()
+            size = settings.QUEUED_EMAIL_BATCH_SIZE
+            for start in range(0, len(batch), size):
+                self.send_batch(batch[start:start + size])
+
+    def load(self, names):
+        records = {}
+        for name in names:
+            try:
+                records[name] = self.spool.read(name)
+            except FileNotFoundError:
+                self.done()
+            except Exception:
+                logger.exception('Не удалось прочитать письмо %s', name)
+                self.spool.fail(name)
+                self.done()
+        return records
+
+    def send_batch(self, names):
+        records = self.load(names)
+        if not records:
+            return
+        connection = get_connection(settings.QUEUED_EMAIL_BACKEND)
+        try:
+            connection.open()
+        except Exception:
+            logger.exception('Не удалось подключиться для отправки писем')
+            for name, record in records.items():
+                self.retry(name, record)
+            return
+        try:
+            for name, record in records.items():
+                try:
+                    connection.send_messages([record['message']])
+                except Exception:
+                    logger.exception('Не удалось отправить письмо %s', name)
+                    self.retry(name, record)
+                else:
+                    self.spool.remove(name)
+                    self.done()
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                logger.exception('Ошибка при закрытии соединения')
+
+    def retry(self, name, record):
+        record['attempts'] += 1
+        if record['attempts'] > settings.QUEUED_EMAIL_MAX_RETRIES:
+            logger.error('Письмо %s не отправлено после %d попыток',
+                         name, record['attempts'])
+            self.spool.fail(name)
+            self.done()
+            return
+        self.spool.write(record, name)
+        delay = (settings.QUEUED_EMAIL_RETRY_DELAY
+                 * 2 ** (record['attempts'] - 1))
+        timer = threading.Timer(delay, self.queue.put, [[name]])
+        timer.daemon = True
+        timer.start()
+
+
+def get_mail_queue(spool_path=None):
+    """Очередь писем процесса для каталога спула, создаётся по требованию.
+
+    Очередь, унаследованная от родительского процесса или потерявшая
+    поток, создаётся заново.
+    """
+    spool_path = spool_path or settings.QUEUED_EMAIL_SPOOL
+    with _queues_lock:
+        mail_queue = _queues.get(spool_path)
+        if mail_queue is None or not mail_queue.alive():
+            mail_queue = _queues[spool_path] = MailQueue(spool_path)
+        return mail_queue
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Почтовый бэкенд, который не ждёт доставки.
+
+    Письма записываются в спул QUEUED_EMAIL_SPOOL и отдаются фоновому
+    потоку, поэтому запрос (например, восстановление пароля) не
+    блокируется на сети. Недоставленные письма переживают перезапуск:
+    новый процесс дочитывает их из спула.
+    """
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        try:
+            get_mail_queue().put(email_messages)
+        except Exception:
+            if not self.fail_silently:
+                raise
+            logger.exception('Не удалось поставить письма в очередь')
+            return 0
+        return len(email_messages)
+
+
+def start_mail_queue():
+    """Запускает очередь писем при старте процесса.
+
+    Так письма, оставшиеся в спуле от остановленных процессов, уходят
+    сразу, а не с первым новым письмом. Если письма отправляет другой
+    бэкенд, ничего не делает.
+    """
+    if issubclass(import_string(settings.EMAIL_BACKEND), QueuedEmailBackend):
+        get_mail_queue()
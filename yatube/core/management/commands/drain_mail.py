@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.mail import get_mail_queue
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма, оставшиеся в спуле от остановленных '
+        'процессов, и ждёт окончания доставки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--timeout', type=float, default=60,
+            help='Сколько секунд ждать доставки (по умолчанию 60).')
+
+    def handle(self, *args, **options):
+        mail_queue = get_mail_queue()
+        if not mail_queue.flush(options['timeout']):
+            raise CommandError(
+                f'Не доставлено писем: {mail_queue.pending}, '
+                'они остались в спуле')
+        self.stdout.write(self.style.SUCCESS(
+            'Спул разобран: письма доставлены или перенесены в failed'))
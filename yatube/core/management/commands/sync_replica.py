@@ -0,0 +1,26 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файл реплики онлайн-бэкапом. '
+        'Нужна для локальной проверки чтения с реплики.'
+    )
+
+    def handle(self, *args, **options):
+        alias = settings.REPLICA_DATABASE
+        if not alias:
+            raise CommandError(
+                'Реплика не настроена: задайте YATUBE_REPLICA_DB')
+        primary = connections['default']
+        primary.ensure_connection()
+        replica = sqlite3.connect(connections[alias].settings_dict['NAME'])
+        try:
+            primary.connection.backup(replica)
+        finally:
+            replica.close()
+        self.stdout.write(self.style.SUCCESS('Реплика обновлена'))
@@ -0,0 +1,208 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.functional import SimpleLazyObject
+
+from . import template_timing
+from .auth import get_cached_user
+from .db_router import finish_request, read_from_replica, start_request
+from .throttling import throttle
+
+logger = logging.getLogger('yatube.sql')
+template_logger = logging.getLogger('yatube.templates')
+
+REPLICA_PIN_COOKIE = 'primary_pin'
+
+
+class QueryStats:
+    """Считает запросы к базе, их суммарное время и самый долгий."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_duration = 0.0
+        self.slowest_sql = ''
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if elapsed >= self.slowest_duration:
+                self.slowest_duration = elapsed
+                self.slowest_sql = sql
+
+
+class QueryBudgetMiddleware:
+    """Собирает статистику SQL по каждому запросу.
+
+    Число запросов и время в базе отдаются заголовками X-DB-Queries
+    и X-DB-Time и пишутся в лог yatube.sql вместе с самым долгим
+    запросом. Превышение бюджета из SQL_QUERY_BUDGETS логируется
+    как предупреждение.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        duration_ms = round(stats.duration * 1000, 3)
+        response['X-DB-Queries'] = str(stats.count)
+        response['X-DB-Time'] = f'{duration_ms:.3f}'
+        budget = settings.SQL_QUERY_BUDGETS.get(view_name)
+        over_budget = budget is not None and stats.count > budget
+        record = {
+            'view': view_name,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': stats.count,
+            'db_time_ms': duration_ms,
+            'slowest_ms': round(stats.slowest_duration * 1000, 3),
+            'slowest_sql': stats.slowest_sql,
+            'budget': budget,
+        }
+        logger.log(
+            logging.WARNING if over_budget else logging.INFO,
+            json.dumps(record, ensure_ascii=False),
+        )
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Отправляет чтения страниц из REPLICA_VIEWS на реплику.
+
+    После POST и других изменяющих запросов, которые писали в базу,
+    пользователь получает cookie и REPLICA_PIN_SECONDS читает
+    с основной базы, чтобы сразу видеть свои изменения, даже если
+    реплика ещё отстаёт. Попутные записи в GET-запросах cookie
+    не ставят, иначе такие страницы не попадали бы в кеш.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = finish_request()
+        if (
+            wrote
+            and settings.REPLICA_DATABASE
+            and request.method not in ('GET', 'HEAD', 'OPTIONS')
+        ):
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            settings.REPLICA_DATABASE
+            and request.method in ('GET', 'HEAD')
+            and request.resolver_match.view_name in settings.REPLICA_VIEWS
+            and REPLICA_PIN_COOKIE not in request.COOKIES
+        ):
+            read_from_replica()
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware, который берёт пользователя из кеша.
+
+    Запрос авторизованного пользователя не читает auth_user, пока
+    пользователь не сохранён заново (см. core.auth).
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_cached_user(request))
+
+
+class ThrottleMiddleware:
+    """Ограничивает частоту пишущих запросов к страницам из THROTTLE_RATES.
+
+    Лимиты задаются по имени URL отдельно для пользователя и для
+    адреса клиента. Сверх лимита отвечает 429 с заголовком
+    Retry-After; GET и HEAD не ограничиваются.
+    """
+
+    def __init__(self, get_response):
+        if not settings.THROTTLE_RATES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return None
+        wait = throttle(request, request.resolver_match.view_name)
+        if not wait:
+            return None
+        response = HttpResponse(
+            'Слишком много запросов, попробуйте позже.',
+            content_type='text/plain; charset=utf-8',
+            status=429,
+        )
+        response['Retry-After'] = str(wait)
+        return response
+
+
+class TemplateTimingMiddleware:
+    """Замеряет время отрисовки каждого шаблона и include в запросе.
+
+    Время отдаётся заголовком Server-Timing (его показывают
+    инструменты разработчика браузера) и пишется в лог
+    yatube.templates. Включается настройкой TEMPLATE_TIMING.
+    """
+
+    def __init__(self, get_response):
+        if not settings.TEMPLATE_TIMING:
+            raise MiddlewareNotUsed
+        template_timing.install()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = template_timing.start_timing()
+        try:
+            response = self.get_response(request)
+        finally:
+            template_timing.stop_timing()
+        report = timings.report()
+        if not report:
+            return response
+        total_ms = sum(row['self_ms'] for row in report)
+        metrics = [f'tpl;desc="templates";dur={total_ms:.3f}']
+        metrics += [
+            f'tpl{index};desc="{row["template"]}";dur={row["self_ms"]:.3f}'
+            for index, row in enumerate(report)
+        ]
+        response['Server-Timing'] = ', '.join(metrics)
+        template_logger.info(json.dumps({
+            'path': request.path,
+            'templates_ms': round(total_ms, 3),
+            'templates': report,
+        }, ensure_ascii=False))
+        return response
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+
+
+class FrontCache:
+    """Небольшой LRU-кеш процесса с коротким временем жизни записей."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires = time.monotonic() + settings.SESSION_FRONT_CACHE_TIMEOUT
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.SESSION_FRONT_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+front_cache = FrontCache()
+
+
+class SessionStore(cached_db.SessionStore):
+    """Сессии в общем кеше с записью в базу и LRU-кешем процесса перед ним.
+
+    Повторный запрос с той же сессией не ходит ни в базу, ни в общий
+    кеш, пока запись в кеше процесса не старше
+    SESSION_FRONT_CACHE_TIMEOUT секунд. Сессия сохраняется, только
+    если её данные действительно изменились.
+
+    Выход удаляет сессию из кеша своего процесса и из общего кеша
+    SESSION_CACHE_ALIAS сразу, а другие процессы перестают видеть её
+    не позже чем через SESSION_FRONT_CACHE_TIMEOUT секунд. Копию
+    из кеша процесса core.auth перечитывает через reload(), прежде
+    чем сбросить сессию из-за несовпавшей версии пароля.
+    """
+
+    front_cache = front_cache
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._snapshot = None
+        self.from_front_cache = False
+
+    def _remember(self, data):
+        raw = self.serializer().dumps(data)
+        self._snapshot = (self.session_key, raw)
+        self.front_cache.set(self.session_key, raw)
+
+    def load(self):
+        raw = (self.front_cache.get(self.session_key)
+               if self.session_key else None)
+        if raw is not None:
+            self._snapshot = (self.session_key, raw)
+            self.from_front_cache = True
+            return self.serializer().loads(raw)
+        return self._load_shared()
+
+    def _load_shared(self):
+        self.from_front_cache = False
+        data = super().load()
+        if data and self.session_key:
+            self._remember(data)
+        return data
+
+    def reload(self):
+        """Перечитывает сессию из общего кеша, минуя кеш процесса."""
+        self._session_cache = self._load_shared()
+
+    def _unchanged(self):
+        if self._snapshot is None or self._snapshot[0] != self.session_key:
+            return False
+        data = self.serializer().dumps(self._get_session())
+        return data == self._snapshot[1]
+
+    def save(self, must_create=False):
+        if (not must_create
+                and not settings.SESSION_SAVE_EVERY_REQUEST
+                and self._unchanged()):
+            return
+        super().save(must_create)
+        self._remember(self._get_session(no_load=must_create))
+
+    def delete(self, session_key=None):
+        super().delete(session_key)
+        session_key = session_key or self.session_key
+        if session_key is not None:
+            self.front_cache.delete(session_key)
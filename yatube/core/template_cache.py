@@ -0,0 +1,46 @@
+import os
+
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+
+
+def template_names(directory):
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            if filename.endswith(('.html', '.txt', '.xml')):
+                path = os.path.join(root, filename)
+                yield os.path.relpath(path, directory).replace(os.sep, '/')
+
+
+def loader_dirs(loader):
+    """Каталоги шаблонов загрузчика, включая вложенные в cached.Loader."""
+    if isinstance(loader, CachedLoader):
+        for inner in loader.loaders:
+            yield from loader_dirs(inner)
+    elif hasattr(loader, 'get_dirs'):
+        yield from loader.get_dirs()
+
+
+def preload_templates():
+    """Разбирает все шаблоны заранее и кладёт их в кэш cached.Loader.
+
+    Первый запрос после выкладки получает уже скомпилированные
+    шаблоны. Возвращает число загруженных шаблонов.
+    """
+    loaded = 0
+    for backend in engines.all():
+        engine = getattr(backend, 'engine', None)
+        if engine is None:
+            continue
+        cached = [loader for loader in engine.template_loaders
+                  if isinstance(loader, CachedLoader)]
+        names = {
+            name
+            for loader in cached
+            for directory in loader_dirs(loader)
+            for name in template_names(str(directory))
+        }
+        for name in sorted(names):
+            engine.get_template(name)
+            loaded += 1
+    return loaded
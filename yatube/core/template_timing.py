@@ -0,0 +1,81 @@
+import threading
+import time
+from functools import wraps
+
+from django.template.base import Template
+
+_state = threading.local()
+
+
+class TemplateTimings:
+    """Время отрисовки шаблонов одного запроса.
+
+    Для каждого шаблона считаются число отрисовок, полное время
+    и собственное время без вложенных include и extends.
+    """
+
+    def __init__(self):
+        self.templates = {}
+        self.stack = []
+
+    def enter(self):
+        self.stack.append(0.0)
+
+    def leave(self, name, elapsed):
+        children = self.stack.pop()
+        if self.stack:
+            self.stack[-1] += elapsed
+        stats = self.templates.setdefault(
+            name, {'count': 0, 'total': 0.0, 'self': 0.0})
+        stats['count'] += 1
+        stats['total'] += elapsed
+        stats['self'] += elapsed - children
+
+    def report(self):
+        """Шаблоны по убыванию собственного времени, в миллисекундах."""
+        rows = [
+            {
+                'template': name,
+                'count': stats['count'],
+                'total_ms': round(stats['total'] * 1000, 3),
+                'self_ms': round(stats['self'] * 1000, 3),
+            }
+            for name, stats in self.templates.items()
+        ]
+        return sorted(rows, key=lambda row: row['self_ms'], reverse=True)
+
+
+def start_timing():
+    _state.timings = TemplateTimings()
+    return _state.timings
+
+
+def stop_timing():
+    _state.timings = None
+
+
+def install():
+    """Оборачивает Template._render замером времени; повторно не
+    оборачивает.
+    """
+    render = Template._render
+    if getattr(render, 'timed', False):
+        return
+
+    @wraps(render)
+    def timed_render(self, context):
+        timings = getattr(_state, 'timings', None)
+        if timings is None:
+            return render(self, context)
+        timings.enter()
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            timings.leave(
+                self.origin.template_name or self.origin.name,
+                time.perf_counter() - started,
+            )
+
+    timed_render.timed = True
+    Template._render = timed_render
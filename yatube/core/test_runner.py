@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+def isolated_shared_cache():
+    """Подменяет общий кеш чистым кешем процесса.
+
+    Иначе тесты делили бы лимиты запросов и сессии с запущенным
+    сайтом и с предыдущими прогонами.
+    """
+    return override_settings(CACHES={
+        **settings.CACHES,
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'shared',
+        },
+    })
+
+
+def clear_caches():
+    """Очищает все кеши проекта, и процесса, и общий."""
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.shared_cache = isolated_shared_cache()
+        self.shared_cache.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.shared_cache.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,30 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from core.apps import SHARED_CACHE_SETTINGS, check_shared_caches
+
+# Проверка только смотрит на класс бэкенда и к memcached не подключается.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': '127.0.0.1:11211',
+    },
+}
+
+
+@override_settings(CACHES=CACHES)
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_process_cache_is_refused(self):
+        """Кеш процесса вместо общего не даёт запустить проект."""
+        for name in SHARED_CACHE_SETTINGS:
+            with self.subTest(setting=name):
+                with override_settings(**{name: 'default'}):
+                    with self.assertRaisesMessage(
+                            ImproperlyConfigured, name):
+                        check_shared_caches()
+
+    def test_project_settings_pass(self):
+        check_shared_caches()
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import User
+
+PASSWORD = 'Old-pass-123'
+
+
+class CachedUserTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='reader', password=PASSWORD)
+
+    def setUp(self):
+        caches[settings.AUTH_USER_CACHE].clear()
+        self.client = self.logged_in_client()
+
+    def logged_in_client(self):
+        client = Client()
+        client.login(username='reader', password=PASSWORD)
+        return client
+
+    def user_queries(self, client):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('posts:follow_index'))
+        return response, [query['sql'] for query in queries.captured_queries
+                          if 'FROM "auth_user"' in query['sql']]
+
+    def test_repeat_requests_do_not_load_user(self):
+        """Повторный запрос берёт пользователя из кеша."""
+        self.user_queries(self.client)
+        response, queries = self.user_queries(self.client)
+        self.assertEqual(response.context['user'], self.user)
+        self.assertEqual(queries, [])
+
+    def test_password_change_logs_out_other_sessions(self):
+        """После смены пароля остальные сессии теряют пользователя."""
+        other = self.logged_in_client()
+        self.user_queries(other)
+        response = self.client.post(reverse('users:ChangePassword'), {
+            'old_password': PASSWORD,
+            'new_password1': 'New-pass-456',
+            'new_password2': 'New-pass-456',
+        })
+        self.assertRedirects(response, reverse('users:PasswordChangeDone'))
+        response, _ = self.user_queries(self.client)
+        self.assertEqual(response.status_code, 200)
+        response, _ = self.user_queries(other)
+        self.assertRedirects(
+            response,
+            f"{reverse('users:login')}?next={reverse('posts:follow_index')}")
+
+    def test_logout_is_not_undone_by_cache(self):
+        self.user_queries(self.client)
+        self.client.get(reverse('users:logout'))
+        response, _ = self.user_queries(self.client)
+        self.assertEqual(response.status_code, 302)
+
+    def test_user_save_invalidates_cache(self):
+        """Отключённый пользователь не остаётся в кеше."""
+        self.user_queries(self.client)
+        user = User.objects.get(pk=self.user.pk)
+        user.is_active = False
+        user.save()
+        response, _ = self.user_queries(self.client)
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,169 @@
+import os
+import shutil
+import socketserver
+import tempfile
+import threading
+from io import StringIO
+from unittest import mock
+
+from django.core.mail import EmailMessage
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from core import mail
+from core.mail import (MailQueue, MailSpool, QueuedEmailBackend,
+                       get_mail_queue, start_mail_queue)
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер: принимает письма и складывает их в память."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply('220 localhost')
+        while True:
+            line = self.rfile.readline().decode().strip()
+            command = line[:4].upper()
+            if not line or command == 'QUIT':
+                self.reply('221 bye')
+                return
+            if command == 'MAIL':
+                with server.lock:
+                    refuse = server.refuse > 0
+                    server.refuse -= refuse
+                self.reply('451 try later' if refuse else '250 ok')
+            elif command == 'DATA':
+                self.reply('354 go ahead')
+                data = []
+                for data_line in iter(self.rfile.readline, b''):
+                    if data_line == b'.\r\n':
+                        break
+                    data.append(data_line)
+                with server.lock:
+                    server.messages.append(b''.join(data))
+                self.reply('250 queued')
+            else:
+                self.reply('250 localhost')
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.refuse = 0
+        self.messages = []
+
+
+class QueuedEmailBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.server = SMTPServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.spool = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool, ignore_errors=True)
+        settings = override_settings(
+            QUEUED_EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            QUEUED_EMAIL_SPOOL=self.spool,
+            QUEUED_EMAIL_RETRY_DELAY=0,
+            QUEUED_EMAIL_MAX_RETRIES=2,
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=self.server.server_address[1],
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def message(self, number):
+        return EmailMessage(
+            f'Письмо {number}', 'Текст', 'noreply@yatube.ru',
+            [f'user{number}@yatube.ru'])
+
+    def spooled(self, path=None):
+        path = path or self.spool
+        return [name for name in os.listdir(path) if name.endswith('.msg')]
+
+    def test_batch_sent_over_one_connection(self):
+        """Пачка писем уходит через одно SMTP-соединение."""
+        sent = QueuedEmailBackend().send_messages(
+            [self.message(number) for number in range(3)])
+        self.assertEqual(sent, 3)
+        self.assertTrue(get_mail_queue().flush(timeout=5))
+        self.assertEqual(len(self.server.messages), 3)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.spooled(), [])
+
+    def test_refused_message_is_retried(self):
+        self.server.refuse = 1
+        QueuedEmailBackend().send_messages([self.message(1)])
+        self.assertTrue(get_mail_queue().flush(timeout=5))
+        self.assertEqual(len(self.server.messages), 1)
+        self.assertEqual(self.spooled(), [])
+
+    def test_gives_up_after_max_retries(self):
+        """После всех попыток письмо переносится в failed."""
+        self.server.refuse = 100
+        QueuedEmailBackend().send_messages([self.message(1)])
+        self.assertTrue(get_mail_queue().flush(timeout=5))
+        self.assertEqual(self.server.messages, [])
+        self.assertEqual(self.spooled(), [])
+        self.assertEqual(
+            len(self.spooled(os.path.join(self.spool, 'failed'))), 1)
+
+    def orphan(self, number):
+        """Кладёт в спул письмо остановленного процесса."""
+        spool = MailSpool(self.spool)
+        name = spool.write({'message': self.message(number), 'attempts': 0})
+        message_id = name.split('.')[0]
+        # pid больше допустимого в Linux: такого процесса точно нет.
+        os.rename(os.path.join(self.spool, name),
+                  os.path.join(self.spool, f'{message_id}.99999999.msg'))
+
+    def test_spooled_mail_survives_restart(self):
+        """Письма остановленного процесса отправляет новый процесс."""
+        self.orphan(1)
+        self.assertTrue(MailQueue(self.spool).flush(timeout=5))
+        self.assertEqual(len(self.server.messages), 1)
+        self.assertEqual(self.spooled(), [])
+
+    @override_settings(EMAIL_BACKEND='core.mail.QueuedEmailBackend')
+    def test_spool_sent_on_startup(self):
+        """Спул отправляется при старте процесса, без нового письма."""
+        self.orphan(1)
+        start_mail_queue()
+        self.assertTrue(mail._queues[self.spool].flush(timeout=5))
+        self.assertEqual(len(self.server.messages), 1)
+
+    def test_drain_command_sends_spool(self):
+        self.orphan(1)
+        self.orphan(2)
+        call_command('drain_mail', timeout=5, stdout=StringIO())
+        self.assertEqual(len(self.server.messages), 2)
+        self.assertEqual(self.spooled(), [])
+
+    def test_queue_recreated_after_fork_or_thread_death(self):
+        """Рабочий процесс после fork и очередь без потока получают
+        новую очередь, а не ту, письма которой никто не отправит.
+        """
+        mail_queue = get_mail_queue()
+        self.assertIs(get_mail_queue(), mail_queue)
+        other_pid = mail_queue.pid + 1
+        with mock.patch('core.mail.os.getpid', return_value=other_pid):
+            forked = get_mail_queue()
+        self.assertIsNot(forked, mail_queue)
+        forked.thread = threading.Thread(target=lambda: None)
+        forked.thread.start()
+        forked.thread.join()
+        restarted = get_mail_queue()
+        self.assertIsNot(restarted, forked)
+        QueuedEmailBackend().send_messages([self.message(1)])
+        self.assertTrue(restarted.flush(timeout=5))
+        self.assertEqual(len(self.server.messages), 1)
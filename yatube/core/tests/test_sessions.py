@@ -0,0 +1,109 @@
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import HASH_SESSION_KEY
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.sessions import FrontCache, SessionStore, front_cache
+from posts.models import User
+
+
+class OtherProcessStore(SessionStore):
+    """Сессии другого процесса: общий кеш тот же, кеш процесса свой."""
+
+    front_cache = FrontCache()
+
+
+class SessionStoreTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        caches[settings.SESSION_CACHE_ALIAS].clear()
+        front_cache.clear()
+        OtherProcessStore.front_cache.clear()
+
+    def session_queries(self, queries):
+        return [query['sql'] for query in queries.captured_queries
+                if 'django_session' in query['sql']]
+
+    def test_repeat_views_do_not_query_sessions(self):
+        """Повторный просмотр страницы не читает и не пишет сессию."""
+        client = Client()
+        client.force_login(self.user)
+        client.get(reverse('posts:follow_index'))
+        with CaptureQueriesContext(connection) as queries:
+            client.get(reverse('posts:follow_index'))
+        self.assertEqual(self.session_queries(queries), [])
+
+    def test_session_read_from_database_after_caches_drop(self):
+        session = SessionStore()
+        session['answer'] = 42
+        session.save()
+        caches[settings.SESSION_CACHE_ALIAS].clear()
+        front_cache.clear()
+        self.assertEqual(SessionStore(session.session_key)['answer'], 42)
+
+    def test_unchanged_data_is_not_written(self):
+        """Сессия с теми же данными не сохраняется повторно."""
+        session = SessionStore()
+        session['answer'] = 42
+        session.save()
+        session = SessionStore(session.session_key)
+        session['answer'] = 42
+        with CaptureQueriesContext(connection) as queries:
+            session.save()
+        self.assertEqual(self.session_queries(queries), [])
+        session['answer'] = 43
+        with CaptureQueriesContext(connection) as queries:
+            session.save()
+        self.assertNotEqual(self.session_queries(queries), [])
+        front_cache.clear()
+        self.assertEqual(SessionStore(session.session_key)['answer'], 43)
+
+    def test_deleted_session_is_dropped_from_front_cache(self):
+        session = SessionStore()
+        session['answer'] = 42
+        session.save()
+        session_key = session.session_key
+        session.flush()
+        self.assertIsNone(front_cache.get(session_key))
+        self.assertNotIn('answer', SessionStore(session_key))
+
+    def test_logout_seen_by_other_process(self):
+        """Выход в одном процессе другой видит, как только истечёт
+        запись его кеша процесса.
+        """
+        client = Client()
+        client.force_login(self.user)
+        session_key = client.session.session_key
+        self.assertIn('_auth_user_id', OtherProcessStore(session_key))
+        client.get(reverse('users:logout'))
+        self.assertIn('_auth_user_id', OtherProcessStore(session_key))
+        expired = time.monotonic() + settings.SESSION_FRONT_CACHE_TIMEOUT
+        with mock.patch('core.sessions.time.monotonic', return_value=expired):
+            self.assertNotIn('_auth_user_id', OtherProcessStore(session_key))
+
+    def test_password_change_in_other_process_keeps_session(self):
+        """Устаревшая копия сессии в кеше процесса после смены пароля
+        в другом процессе не выходит из сессии.
+        """
+        client = Client()
+        client.force_login(self.user)
+        client.get(reverse('posts:follow_index'))
+        session_key = client.session.session_key
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('New-pass-456')
+        user.save()
+        other = OtherProcessStore(session_key)
+        other[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        other.save()
+        response = client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['user'], self.user)
@@ -0,0 +1,111 @@
+import threading
+import time
+from http import HTTPStatus
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core.throttling import throttle
+from posts.models import Post, User
+
+RATES = {
+    'posts:create': {'user': '2/m', 'ip': '3/m'},
+    'users:signup': {'ip': '1/h'},
+}
+
+
+@override_settings(THROTTLE_RATES=RATES)
+class ThrottleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='writer')
+        cls.other = User.objects.create_user(username='other')
+
+    def setUp(self):
+        caches[settings.THROTTLE_CACHE].clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.clock = mock.patch('core.throttling.time.time', return_value=0)
+        self.now = self.clock.start()
+        self.addCleanup(self.clock.stop)
+
+    def create(self, client):
+        return client.post(reverse('posts:create'), {'text': 'Пост'})
+
+    def test_user_over_limit_gets_429(self):
+        """Сверх лимита пост не создаётся, а ответ говорит, когда повторить."""
+        for _ in range(2):
+            self.assertEqual(
+                self.create(self.client).status_code, HTTPStatus.FOUND)
+        response = self.create(self.client)
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_tokens_refill_over_time(self):
+        for _ in range(2):
+            self.create(self.client)
+        self.now.return_value = 30
+        self.assertEqual(
+            self.create(self.client).status_code, HTTPStatus.FOUND)
+        self.assertEqual(
+            self.create(self.client).status_code,
+            HTTPStatus.TOO_MANY_REQUESTS)
+
+    def test_ip_limit_covers_all_users(self):
+        """Лимит адреса действует на всех пользователей с него."""
+        other_client = Client()
+        other_client.force_login(self.other)
+        for _ in range(2):
+            self.create(self.client)
+        self.assertEqual(
+            self.create(other_client).status_code, HTTPStatus.FOUND)
+        response = self.create(other_client)
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '20')
+
+    def test_reads_and_other_views_are_not_throttled(self):
+        for _ in range(5):
+            self.assertEqual(
+                self.client.get(reverse('posts:create')).status_code,
+                HTTPStatus.OK)
+        post = Post.objects.create(author=self.user, text='Пост')
+        url = reverse('posts:post_edit', kwargs={'post_id': post.pk})
+        for _ in range(5):
+            self.assertEqual(
+                self.client.post(url, {'text': 'Правка'}).status_code,
+                HTTPStatus.FOUND)
+
+    def test_anonymous_signup_limited_by_ip(self):
+        url = reverse('users:signup')
+        guest = Client()
+        guest.post(url, {})
+        response = guest.post(url, {})
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '3600')
+
+    def test_concurrent_requests_do_not_share_token(self):
+        """Пока один запрос списывает токен, второй ждёт блокировку
+        и видит уже пустую корзину.
+        """
+        request = RequestFactory().post(reverse('users:signup'))
+        cache = caches[settings.THROTTLE_CACHE]
+        get_many = cache.get_many
+        racer = threading.Thread(
+            target=lambda: waits.append(throttle(request, 'users:signup')))
+        waits = []
+
+        def slow_get_many(keys):
+            states = get_many(keys)
+            if racer.ident is None:
+                racer.start()
+                time.sleep(0.05)
+            return states
+
+        with mock.patch.object(cache, 'get_many', slow_get_many):
+            self.assertEqual(throttle(request, 'users:signup'), 0)
+            racer.join()
+        self.assertEqual(waits, [3600])
@@ -0,0 +1,128 @@
+import math
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+# Блокировка корзин: сколько секунд живёт ключ, если его владелец
+# упал, и сколько раз и с какой паузой пытаться её взять.
+LOCK_TIMEOUT = 5
+LOCK_ATTEMPTS = 20
+LOCK_WAIT = 0.005
+
+
+def parse_rate(rate):
+    """Разбирает лимит вида '10/m' в (ёмкость, секунд на полное пополнение)."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR') or 'unknown'
+
+
+class TokenBucket:
+    """Корзина токенов, состояние которой хранится в общем кеше.
+
+    В кеше лежит пара (остаток токенов, время последнего списания).
+    Токены пополняются равномерно: capacity штук за period секунд.
+    """
+
+    def __init__(self, key, rate):
+        self.key = key
+        self.capacity, self.period = parse_rate(rate)
+
+    @property
+    def refill(self):
+        return self.capacity / self.period
+
+    def take(self, state, now):
+        """Списывает токен: (новое состояние, сколько секунд ждать)."""
+        if state is None:
+            tokens = self.capacity
+        else:
+            tokens, updated = state
+            tokens = min(
+                self.capacity, tokens + (now - updated) * self.refill)
+        if tokens < 1:
+            return (tokens, now), (1 - tokens) / self.refill
+        return (tokens - 1, now), 0
+
+
+def request_buckets(request, view_name):
+    """Корзины, через которые проходит запрос к view_name.
+
+    Запрос авторизованного пользователя проходит и через его личную
+    корзину, и через корзину адреса; анонимный — только через адрес.
+    """
+    rates = settings.THROTTLE_RATES.get(view_name)
+    if not rates:
+        return []
+    buckets = []
+    user = getattr(request, 'user', None)
+    if 'user' in rates and user is not None and user.is_authenticated:
+        buckets.append(TokenBucket(
+            f'throttle:{view_name}:user:{user.pk}', rates['user']))
+    if 'ip' in rates:
+        buckets.append(TokenBucket(
+            f'throttle:{view_name}:ip:{client_ip(request)}', rates['ip']))
+    return buckets
+
+
+@contextmanager
+def locked(cache, keys):
+    """Держит блокировки ключей, взятые через cache.add.
+
+    Ключи берутся по порядку, чтобы два запроса не ждали друг друга
+    крест-накрест. Блокировку, которую не удалось взять за
+    LOCK_ATTEMPTS попыток (её владелец упал), запрос пропускает.
+    """
+    held = []
+    try:
+        for key in sorted(keys):
+            lock = f'{key}:lock'
+            for _ in range(LOCK_ATTEMPTS):
+                if cache.add(lock, 1, LOCK_TIMEOUT):
+                    held.append(lock)
+                    break
+                time.sleep(LOCK_WAIT)
+        yield
+    finally:
+        cache.delete_many(held)
+
+
+def throttle(request, view_name):
+    """Пропускает запрос через корзины; возвращает секунды до повтора.
+
+    Ноль означает, что запрос допущен. Если хотя бы одна корзина
+    пуста, токены не списываются ни из одной. Чтение и запись корзин
+    идут под блокировкой, поэтому параллельные запросы не списывают
+    один и тот же токен. В memcached cache.add атомарен; файловый кеш
+    проверяет и пишет ключ в два шага, и там гонка остаётся возможной.
+    """
+    buckets = request_buckets(request, view_name)
+    if not buckets:
+        return 0
+    cache = caches[settings.THROTTLE_CACHE]
+    keys = [bucket.key for bucket in buckets]
+    with locked(cache, keys):
+        return take_tokens(cache, buckets)
+
+
+def take_tokens(cache, buckets):
+    states = cache.get_many([bucket.key for bucket in buckets])
+    now = time.time()
+    updates = {}
+    wait = 0
+    for bucket in buckets:
+        updates[bucket.key], bucket_wait = bucket.take(
+            states.get(bucket.key), now)
+        wait = max(wait, bucket_wait)
+    if wait:
+        return math.ceil(wait)
+    timeout = max(bucket.period for bucket in buckets)
+    cache.set_many(updates, timeout)
+    return 0
@@ -1,5 +1,7 @@
 from django.contrib import admin
+from .forms import use_group_registry
 from .models import Post, Group
+from .search import matching_ids
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -11,10 +13,26 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    # select_related() без аргументов не идёт по необязательной группе.
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        field = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == 'group':
+            # Выпадающий список групп в каждой строке list_editable
+            # берётся из реестра, а не отдельным запросом.
+            use_group_registry(field)
+        return field
+
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по тексту идёт через индекс FTS5, а не LIKE '%q%'.
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(pk__in=matching_ids(search_term)), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
@@ -0,0 +1,149 @@
+"""Read-only JSON API лент и постов.
+
+Поля ответа выбираются параметром fields=id,text,author; из базы
+читаются только нужные столбцы, автор и группа подтягиваются тем же
+запросом через JOIN. Ленты листаются курсором after/before, как
+HTML-страницы.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+
+from .conditional import (author_state, conditional_page, global_state,
+                          group_state, post_state)
+from .groups import get_group_or_404
+from .models import Post, User
+from .utils import CURSOR_KEY, CursorPaginator
+
+
+def iso(value):
+    return value.isoformat()
+
+
+def media_url(name):
+    return default_storage.url(name) if name else None
+
+
+# Имя поля в ответе: (столбец values(), преобразование значения).
+API_FIELDS = {
+    'id': ('pk', None),
+    'text': ('text', None),
+    'pub_date': ('pub_date', iso),
+    'updated_at': ('updated_at', iso),
+    'author': ('author__username', None),
+    'group': ('group__slug', None),
+    'image': ('image', media_url),
+}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def requested_fields(request):
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(API_FIELDS)
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = set(fields) - set(API_FIELDS)
+    if unknown:
+        raise BadRequest(
+            f'Неизвестные поля: {", ".join(sorted(unknown))}. '
+            f'Доступны: {", ".join(API_FIELDS)}'
+        )
+    return fields
+
+
+def columns(fields, extra=()):
+    return list(dict.fromkeys(
+        [*extra, *(API_FIELDS[name][0] for name in fields)]))
+
+
+def serialize(row, fields):
+    record = {}
+    for name in fields:
+        column, convert = API_FIELDS[name]
+        value = row[column]
+        record[name] = (
+            convert(value) if convert and value is not None else value)
+    return record
+
+
+def page_limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.NUMBER_OBJECTS))
+    except ValueError:
+        raise BadRequest('limit должен быть числом')
+    return max(1, min(limit, settings.API_MAX_LIMIT))
+
+
+def page_link(request, direction, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params.pop('after', None)
+    params.pop('before', None)
+    params[direction] = cursor
+    return f'{request.path}?{params.urlencode()}'
+
+
+def feed_response(request, posts):
+    """Страница ленты одним запросом: только выбранные столбцы."""
+    fields = requested_fields(request)
+    paginator = CursorPaginator(
+        posts.values(*columns(fields, CURSOR_KEY)),
+        page_limit(request),
+    )
+    page_obj = paginator.cursor_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+    return JsonResponse({
+        'results': [serialize(row, fields) for row in page_obj],
+        'next': page_link(request, 'after', page_obj.next_cursor),
+        'previous': page_link(request, 'before', page_obj.previous_cursor),
+    })
+
+
+def api_view(view):
+    """Отдаёт ошибки запроса как JSON с кодом 400."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except BadRequest as error:
+            return JsonResponse({'error': str(error)}, status=400)
+    return wrapper
+
+
+@api_view
+@conditional_page(global_state)
+def post_list(request):
+    return feed_response(request, Post.objects.all())
+
+
+@api_view
+@conditional_page(group_state)
+def group_posts(request, slug):
+    group = get_group_or_404(slug)
+    return feed_response(request, Post.objects.filter(group_id=group.pk))
+
+
+@api_view
+@conditional_page(author_state)
+def author_posts(request, username):
+    author_id = get_object_or_404(
+        User.objects.values_list('pk', flat=True), username=username)
+    return feed_response(request, Post.objects.filter(author_id=author_id))
+
+
+@api_view
+@conditional_page(post_state)
+def post_detail(request, post_id):
+    fields = requested_fields(request)
+    row = get_object_or_404(
+        Post.objects.values(*columns(fields)), pk=post_id)
+    return JsonResponse(serialize(row, fields))
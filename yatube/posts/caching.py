@@ -0,0 +1,118 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+CARD_VERSION = 2
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+
+
+def card_cache():
+    return caches[settings.POST_CARD_CACHE]
+
+
+def card_key(post_id):
+    """Ключ отрисованной карточки поста: id поста и версия шаблона."""
+    return f'post_card:{CARD_VERSION}:{post_id}'
+
+
+def invalidate_cards(post_ids):
+    """Удаляет из кэша карточки перечисленных постов."""
+    keys = [card_key(post_id) for post_id in post_ids]
+    if keys:
+        card_cache().delete_many(keys)
+
+
+def feed_cache():
+    return caches[settings.FEED_PAGE_CACHE]
+
+
+def current_version(alias, key):
+    """Текущее значение счётчика версии key в кэше alias.
+
+    Новая версия начинается с текущего времени в миллисекундах,
+    чтобы после вытеснения ключа из кэша не вернуться к старой.
+    """
+    cache = caches[alias]
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(alias, key):
+    """Поднимает счётчик версии key в кэше alias."""
+    cache = caches[alias]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), None)
+
+
+def version_cache():
+    return caches[settings.FEED_VERSION_CACHE]
+
+
+def version_key(scope):
+    return f'feed_version:{scope}'
+
+
+def feed_version(scope):
+    """Текущая версия ленты scope ('global', 'group:<slug>', ...).
+
+    Версии лежат в общем кэше FEED_VERSION_CACHE, поэтому запись
+    в одном процессе сразу делает устаревшими страницы во всех.
+    """
+    return current_version(settings.FEED_VERSION_CACHE, version_key(scope))
+
+
+def bump_feeds(*scopes):
+    """Делает устаревшими все закэшированные страницы лент scopes."""
+    for scope in scopes:
+        bump_version(settings.FEED_VERSION_CACHE, version_key(scope))
+
+
+def page_key(scope, request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'feed_page:{scope}:{feed_version(scope)}:{path}'
+
+
+def cache_anonymous_page(scope, timeout_setting='FEED_PAGE_TIMEOUT'):
+    """Кэширует страницу ленты для анонимных GET-запросов.
+
+    scope — шаблон имени ленты, заполняемый аргументами view,
+    например 'group:{slug}'; timeout_setting — имя настройки со
+    временем хранения. Страницы хранятся под текущей версией ленты,
+    поэтому bump_feeds сразу делает их недоступными.
+    Закэшированная страница сверяется с If-None-Match и
+    If-Modified-Since запроса по своим ETag и Last-Modified.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            timeout = getattr(settings, timeout_setting)
+            if (not timeout or request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            cache = feed_cache()
+            key = page_key(scope.format(**kwargs), request)
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200 and not response.cookies:
+                    cache.set(key, response, timeout)
+                return response
+            return get_conditional_response(
+                request,
+                etag=response.get('ETag'),
+                last_modified=parse_http_date_safe(
+                    response.get('Last-Modified', '')),
+                response=response,
+            )
+        return wrapper
+    return decorator
@@ -0,0 +1,69 @@
+import hashlib
+from functools import wraps
+
+from django.db.models import Max
+from django.views.decorators.http import condition
+
+from .caching import feed_version
+from .models import Post
+
+
+def feed_state(scope, **filters):
+    """Время последней правки постов ленты и её версия.
+
+    Max(updated_at) читается по индексу (…, updated_at) одним
+    запросом; версия ленты из кэша меняется и при удалении поста,
+    и при правке автора или группы, которых updated_at не видит.
+    """
+    updated = Post.objects.filter(**filters).aggregate(
+        updated=Max('updated_at'))['updated']
+    return updated, feed_version(scope)
+
+
+def global_state():
+    return feed_state('global')
+
+
+def group_state(slug):
+    return feed_state(f'group:{slug}', group__slug=slug)
+
+
+def author_state(username):
+    return feed_state(f'author:{username}', author__username=username)
+
+
+def post_state(post_id):
+    row = Post.objects.filter(pk=post_id).values_list(
+        'updated_at', 'author__username').first()
+    if row is None:
+        return None, None
+    updated, username = row
+    return updated, feed_version(f'author:{username}')
+
+
+def conditional_page(state):
+    """Отвечает 304 без отрисовки, если страница не менялась.
+
+    state(**view_kwargs) возвращает (время последней правки, версия);
+    из них строятся Last-Modified и ETag. В ETag входит и id
+    пользователя: авторизованные видят другую шапку страницы.
+    """
+    def validators(request, **kwargs):
+        if not hasattr(request, '_page_validators'):
+            updated, version = state(**kwargs)
+            etag = None
+            if updated is not None:
+                raw = f'{version}:{updated.isoformat()}:{request.user.pk}'
+                etag = hashlib.md5(raw.encode()).hexdigest()
+            request._page_validators = (etag, updated)
+        return request._page_validators
+
+    def decorator(view):
+        conditional_view = condition(
+            etag_func=lambda request, **kwargs: validators(
+                request, **kwargs)[0],
+            last_modified_func=lambda request, **kwargs: validators(
+                request, **kwargs)[1],
+        )(view)
+        return wraps(view)(conditional_view)
+    return decorator
@@ -0,0 +1,94 @@
+from django.db.models import Count, F
+
+from .models import AuthorStats, Follow, Group, Post
+
+
+def author_stats_defaults(author_id):
+    """Счётчики автора, посчитанные по таблицам постов и подписок."""
+    return {
+        'posts_count': Post.objects.filter(author_id=author_id).count(),
+        'followers_count':
+            Follow.objects.filter(author_id=author_id).count(),
+    }
+
+
+def change_author_count(author_id, delta, field='posts_count'):
+    """Сдвигает счётчик автора field на delta.
+
+    Строка счётчиков создаётся пересчётом при первом увеличении,
+    поэтому авторы с постами из bulk_create тоже получают верное число.
+    """
+    updated = AuthorStats.objects.filter(author_id=author_id).update(
+        **{field: F(field) + delta})
+    if not updated and delta > 0:
+        AuthorStats.objects.get_or_create(
+            author_id=author_id,
+            defaults=author_stats_defaults(author_id),
+        )
+
+
+def change_group_count(group_id, delta):
+    """Сдвигает счётчик постов группы на delta."""
+    if group_id is not None:
+        Group.objects.filter(pk=group_id).update(
+            posts_count=F('posts_count') + delta)
+
+
+def author_stats(author):
+    """Счётчики автора без подсчёта по таблице постов."""
+    try:
+        return author.post_stats
+    except AuthorStats.DoesNotExist:
+        stats, _ = AuthorStats.objects.get_or_create(
+            author=author,
+            defaults=author_stats_defaults(author.pk),
+        )
+        return stats
+
+
+def author_posts_count(author):
+    """Количество постов автора без подсчёта по таблице постов."""
+    return author_stats(author).posts_count
+
+
+def recount_posts():
+    """Пересчитывает все счётчики и исправляет расхождения.
+
+    Возвращает пару (исправлено авторов, исправлено групп).
+    """
+    actual = {}
+    for field, counts in (
+        ('posts_count', Post.objects.values_list('author_id')),
+        ('followers_count', Follow.objects.values_list('author_id')),
+    ):
+        for author_id, total in counts.order_by().annotate(
+                total=Count('pk')):
+            actual.setdefault(author_id, {})[field] = total
+    fixed_authors = 0
+    for stats in AuthorStats.objects.all():
+        counts = actual.pop(stats.author_id, {})
+        posts_count = counts.get('posts_count', 0)
+        followers_count = counts.get('followers_count', 0)
+        if (stats.posts_count, stats.followers_count) != (
+                posts_count, followers_count):
+            stats.posts_count = posts_count
+            stats.followers_count = followers_count
+            stats.save(update_fields=('posts_count', 'followers_count'))
+            fixed_authors += 1
+    AuthorStats.objects.bulk_create(
+        AuthorStats(author_id=author_id, **counts)
+        for author_id, counts in actual.items()
+    )
+    fixed_authors += len(actual)
+
+    group_counts = dict(
+        Post.objects.filter(group__isnull=False)
+        .order_by().values_list('group_id').annotate(total=Count('pk')))
+    fixed_groups = 0
+    for group in Group.objects.only('pk', 'posts_count'):
+        actual_count = group_counts.get(group.pk, 0)
+        if group.posts_count != actual_count:
+            group.posts_count = actual_count
+            group.save(update_fields=('posts_count',))
+            fixed_groups += 1
+    return fixed_authors, fixed_groups
@@ -0,0 +1,128 @@
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from .caching import cache_anonymous_page
+from .conditional import (author_state, conditional_page, global_state,
+                          group_state)
+from .groups import get_group_or_404
+from .models import Post, User
+
+
+class LatestPostsFeed(Feed):
+    """RSS последних SYNDICATION_ITEMS постов сайта."""
+
+    title = 'Yatube: последние записи'
+    description = 'Новые записи всех авторов'
+
+    def link(self):
+        return reverse('posts:index')
+
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        # Последние записи читаются с конца индекса (…, pub_date),
+        # а не сортировкой всей ленты.
+        return self.posts(obj).select_related(
+            'author', 'group').order_by(
+            '-pub_date', '-pk')[:settings.SYNDICATION_ITEMS]
+
+    def item_title(self, item):
+        return Truncator(item.text).words(8)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return [item.group.title] if item.group else []
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        return get_group_or_404(slug)
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('posts:group_list', args=[obj.slug])
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Yatube: {obj.get_full_name() or obj.username}'
+
+    def description(self, obj):
+        return f'Записи автора {obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=[obj.username])
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+
+class AtomMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class LatestPostsAtomFeed(AtomMixin, LatestPostsFeed):
+    pass
+
+
+class GroupPostsAtomFeed(AtomMixin, GroupPostsFeed):
+    pass
+
+
+class AuthorPostsAtomFeed(AtomMixin, AuthorPostsFeed):
+    pass
+
+
+def syndication_view(feed, scope, state):
+    """Лента с кэшем по версии scope и ответом 304 по state.
+
+    Версия scope общая для всех процессов, поэтому долгий
+    SYNDICATION_TIMEOUT не оставляет устаревших лент.
+    """
+    return cache_anonymous_page(scope, 'SYNDICATION_TIMEOUT')(
+        conditional_page(state)(feed))
+
+
+latest_rss = syndication_view(LatestPostsFeed(), 'global', global_state)
+latest_atom = syndication_view(
+    LatestPostsAtomFeed(), 'global', global_state)
+group_rss = syndication_view(GroupPostsFeed(), 'group:{slug}', group_state)
+group_atom = syndication_view(
+    GroupPostsAtomFeed(), 'group:{slug}', group_state)
+author_rss = syndication_view(
+    AuthorPostsFeed(), 'author:{username}', author_state)
+author_atom = syndication_view(
+    AuthorPostsAtomFeed(), 'author:{username}', author_state)
@@ -1,12 +1,48 @@
 from django.forms import ModelForm
+from django.forms.models import ModelChoiceIterator
 from posts.models import Post
 
+from .groups import group_registry
+
+
+class GroupChoiceIterator(ModelChoiceIterator):
+    """Варианты выбора группы из реестра групп, без запроса к базе."""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for group in group_registry.all():
+            yield self.choice(group)
+
+    def __len__(self):
+        return (len(group_registry.all())
+                + (1 if self.field.empty_label is not None else 0))
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(
+            group_registry.all())
+
+
+def use_group_registry(field):
+    """Переключает выбор группы в поле формы на реестр групп.
+
+    Проверка присланного значения по-прежнему идёт через базу:
+    она нужна только при сохранении формы.
+    """
+    field.iterator = GroupChoiceIterator
+    field.widget.choices = field.choices
+    return field
+
 
 class PostForm(ModelForm):
     class Meta:
         model = Post
-        fields = ('text', 'group')
+        fields = ('text', 'group', 'image')
         labels = {'group': 'Группа',
                   'text': 'Текст'}
         help_texts = {"text": "Обязательное поле!",
                       "group": "Необязательное поле!", }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        use_group_registry(self.fields['group'])
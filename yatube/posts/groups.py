@@ -0,0 +1,83 @@
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+
+from .caching import bump_version, current_version
+from .models import Group
+
+VERSION_KEY = 'group_registry:version'
+
+
+def registry_version():
+    return current_version(settings.GROUP_REGISTRY_CACHE, VERSION_KEY)
+
+
+def bump_registry():
+    bump_version(settings.GROUP_REGISTRY_CACHE, VERSION_KEY)
+
+
+class GroupRegistry:
+    """Все группы в памяти процесса.
+
+    Группы загружаются одним запросом при первом обращении и
+    перечитываются, когда меняется версия реестра в кеше
+    GROUP_REGISTRY_CACHE, общем для всех процессов: её поднимают
+    сигналы сохранения и удаления группы, так что изменения видят
+    и остальные процессы. Отданные экземпляры общие для всех запросов
+    и не должны изменяться; счётчик posts_count в них не обновляется.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._by_slug = {}
+        self._by_pk = {}
+
+    def _groups(self):
+        version = registry_version()
+        with self._lock:
+            if version == self._version:
+                return self._by_slug, self._by_pk
+        groups = list(Group.objects.order_by('pk'))
+        by_slug = {group.slug: group for group in groups}
+        by_pk = {group.pk: group for group in groups}
+        with self._lock:
+            self._version = version
+            self._by_slug, self._by_pk = by_slug, by_pk
+        return by_slug, by_pk
+
+    def all(self):
+        return list(self._groups()[1].values())
+
+    def get(self, slug):
+        return self._groups()[0].get(slug)
+
+    def get_by_pk(self, pk):
+        return self._groups()[1].get(pk)
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+
+
+group_registry = GroupRegistry()
+
+
+def invalidate_groups():
+    """Сбрасывает реестр групп во всех процессах.
+
+    Версия поднимается ещё раз после коммита, чтобы процесс,
+    перечитавший группы до коммита, не остался со старыми данными.
+    """
+    group_registry.invalidate()
+    bump_registry()
+    transaction.on_commit(bump_registry)
+
+
+def get_group_or_404(slug):
+    group = group_registry.get(slug)
+    if group is None:
+        raise Http404('Группа не найдена')
+    return group
@@ -0,0 +1,197 @@
+import itertools
+import json
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from faker import Faker
+
+from posts import urls as posts_urls
+from posts.counters import recount_posts
+from posts.groups import invalidate_groups
+from posts.models import Group, Post, User
+
+USER_PREFIX = 'bench_user_'
+GROUP_PREFIX = 'bench-group-'
+TEXT_POOL_SIZE = 1000
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(samples, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[rank - 1]
+
+
+def fetch(client, url):
+    """GET-запрос целиком: потоковый ответ (выгрузки) дочитывается,
+    иначе замер покрыл бы только подготовку view.
+    """
+    response = client.get(url)
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу тестовыми данными и замеряет задержку и число '
+        'SQL-запросов для каждого адреса posts/urls.py. '
+        'Пример: --users 1000 --groups 100 --posts 1000000'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--skip-seed', action='store_true',
+            help='Замерять на уже заполненной базе')
+        parser.add_argument(
+            '--requests', type=int, default=100,
+            help='Количество запросов на каждый адрес')
+        parser.add_argument(
+            '--output', default='benchmark.json',
+            help='Куда записать результаты в формате JSON')
+        parser.add_argument(
+            '--compare',
+            help='Файл с прошлыми результатами для сравнения')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        if not options['skip_seed']:
+            self.seed(options)
+        results = {
+            'volumes': {
+                'users': User.objects.count(),
+                'groups': Group.objects.count(),
+                'posts': Post.objects.count(),
+            },
+            'requests': options['requests'],
+            'views': self.benchmark(options['requests']),
+        }
+        with open(options['output'], 'w') as output:
+            json.dump(results, output, ensure_ascii=False, indent=2)
+        self.report(results['views'])
+        if options['compare']:
+            with open(options['compare']) as baseline:
+                self.compare(json.load(baseline)['views'], results['views'])
+
+    def seed(self, options):
+        fake = Faker('ru_RU')
+        Faker.seed(options['seed'])
+        started = time.perf_counter()
+        User.objects.bulk_create(
+            (User(username=f'{USER_PREFIX}{i}',
+                  first_name=fake.first_name(),
+                  last_name=fake.last_name(),
+                  password=make_password(None))
+             for i in range(options['users'])),
+            batch_size=options['batch_size'],
+            ignore_conflicts=True,
+        )
+        Group.objects.bulk_create(
+            (Group(title=fake.catch_phrase()[:200],
+                   slug=f'{GROUP_PREFIX}{i}',
+                   description=fake.paragraph())
+             for i in range(options['groups'])),
+            batch_size=options['batch_size'],
+            ignore_conflicts=True,
+        )
+        # bulk_create не шлёт сигналов: реестр групп сбрасываем сами.
+        invalidate_groups()
+        author_ids = list(User.objects.filter(
+            username__startswith=USER_PREFIX).values_list('pk', flat=True))
+        group_ids = list(Group.objects.filter(
+            slug__startswith=GROUP_PREFIX).values_list('pk', flat=True))
+        group_ids.append(None)
+        texts = [fake.paragraph(nb_sentences=5)
+                 for _ in range(TEXT_POOL_SIZE)]
+        posts = (
+            Post(author_id=random.choice(author_ids),
+                 group_id=random.choice(group_ids),
+                 text=random.choice(texts))
+            for _ in range(options['posts'])
+        )
+        while True:
+            batch = list(itertools.islice(posts, options['batch_size']))
+            if not batch:
+                break
+            with transaction.atomic():
+                Post.objects.bulk_create(batch)
+        recount_posts()
+        self.stdout.write(
+            f'Данные созданы за {time.perf_counter() - started:.1f} с')
+
+    def sample_kwargs(self):
+        post = Post.objects.select_related('author', 'group').filter(
+            group__isnull=False).order_by('-pk').first()
+        if post is None:
+            post = Post.objects.select_related('author').order_by(
+                '-pk').first()
+        return post, {
+            'slug': post.group.slug if post.group else None,
+            'username': post.author.username,
+            'post_id': post.pk,
+        }
+
+    def benchmark(self, requests):
+        post, values = self.sample_kwargs()
+        client = Client()
+        client.force_login(post.author)
+        views = {}
+        for pattern in posts_urls.urlpatterns:
+            name = f'{posts_urls.app_name}:{pattern.name}'
+            if name in views:
+                continue
+            kwargs = {
+                key: values[key] for key in pattern.pattern.converters}
+            if None in kwargs.values():
+                continue
+            url = reverse(name, kwargs=kwargs)
+            fetch(client, url)
+            timings = []
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(requests):
+                    started = time.perf_counter()
+                    fetch(client, url)
+                    timings.append((time.perf_counter() - started) * 1000)
+            views[name] = {
+                'url': url,
+                **{f'p{percent}_ms': round(percentile(timings, percent), 3)
+                   for percent in PERCENTILES},
+                'queries': len(queries) / requests,
+            }
+        return views
+
+    def report(self, views):
+        for name, stats in views.items():
+            self.stdout.write(
+                f'{name:24} p50 {stats["p50_ms"]:8.2f} мс  '
+                f'p95 {stats["p95_ms"]:8.2f} мс  '
+                f'p99 {stats["p99_ms"]:8.2f} мс  '
+                f'запросов {stats["queries"]:g}'
+            )
+
+    def compare(self, baseline, views):
+        self.stdout.write('Сравнение с базовым замером:')
+        for name, stats in views.items():
+            old = baseline.get(name)
+            if old is None:
+                self.stdout.write(f'{name:24} нет в базовом замере')
+                continue
+            change = (stats['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100
+            line = (f'{name:24} p95 {change:+7.1f}%  '
+                    f'запросов {old["queries"]:g} -> {stats["queries"]:g}')
+            if change > 0 or stats['queries'] > old['queries']:
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
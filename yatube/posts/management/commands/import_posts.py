@@ -0,0 +1,200 @@
+import csv
+import itertools
+import json
+import os
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.counters import recount_posts
+from posts.models import Follow, Group, Post, User
+from posts.signals import bump_post_feeds
+from posts.timeline import backfill_follow
+
+FORMATS = ('jsonl', 'csv')
+# Сколько номеров строк с неверным JSON показать в отчёте.
+BAD_LINES_SHOWN = 20
+
+
+def read_jsonl(path):
+    """Строки файла как (номер строки, словарь или None, если это не JSON)."""
+    with open(path, encoding='utf-8') as source:
+        for line_number, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as source:
+        reader = csv.DictReader(source)
+        try:
+            for row in reader:
+                yield reader.line_num, row
+        except csv.Error as error:
+            raise CommandError(f'Строка {reader.line_num}: {error}')
+
+
+def parse_pub_date(value):
+    """Дата ISO 8601 с часовым поясом или None, если она неверна."""
+    try:
+        pub_date = parse_datetime(value)
+    except ValueError:
+        # Формат верный, но такой даты нет: 2020-02-30.
+        return None
+    if pub_date is not None and timezone.is_naive(pub_date):
+        pub_date = timezone.make_aware(pub_date)
+    return pub_date
+
+
+INSERT_FIELDS = [
+    field for field in Post._meta.concrete_fields
+    if not field.primary_key
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты из файла JSON Lines или CSV с полями text, '
+        'author (username), group (slug, необязательно) и pub_date '
+        '(ISO 8601, необязательно). Пример: import_posts posts.jsonl'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат файла; по умолчанию по расширению')
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Постов в одном INSERT')
+        parser.add_argument(
+            '--transaction-size', type=int, default=10,
+            help='Пачек в одной транзакции')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(
+            path)[1].lstrip('.').lower()
+        if file_format not in FORMATS:
+            raise CommandError(
+                f'Неизвестный формат {file_format!r}, '
+                f'укажите --format {"/".join(FORMATS)}')
+        if not os.path.exists(path):
+            raise CommandError(f'Файл {path} не найден')
+        reader = read_jsonl if file_format == 'jsonl' else read_csv
+
+        self.authors = dict(User.objects.values_list('username', 'pk'))
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.skipped = Counter()
+        self.bad_lines = []
+        self.author_ids = set()
+        self.group_ids = set()
+        posts = (post for post in itertools.starmap(
+                 self.build_post, reader(path)) if post is not None)
+        rows_per_transaction = (
+            options['batch_size'] * options['transaction_size'])
+
+        started = time.perf_counter()
+        imported = 0
+        try:
+            while True:
+                chunk = itertools.islice(posts, rows_per_transaction)
+                with transaction.atomic():
+                    count = self.insert(chunk, options['batch_size'])
+                if not count:
+                    break
+                imported += count
+                self.stdout.write(self.progress(imported, started))
+        finally:
+            # Уже закоммиченные пачки получают счётчики и ленты, даже
+            # если загрузка оборвалась на середине файла.
+            self.finish()
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено постов: {imported}. '
+            f'{self.progress(imported, started)}'
+        ))
+        for reason, count in sorted(self.skipped.items()):
+            self.stdout.write(self.style.WARNING(
+                f'Пропущено ({reason}): {count}'))
+        if self.bad_lines:
+            lines = ', '.join(map(str, self.bad_lines))
+            more = ('…' if self.skipped['неверный JSON'] > len(self.bad_lines)
+                    else '')
+            self.stdout.write(self.style.WARNING(
+                f'Строки с неверным JSON: {lines}{more}'))
+
+    def build_post(self, line_number, row):
+        if row is None:
+            self.skipped['неверный JSON'] += 1
+            # Хранятся только показываемые номера, всего их в self.skipped.
+            if len(self.bad_lines) < BAD_LINES_SHOWN:
+                self.bad_lines.append(line_number)
+            return None
+        text = row.get('text')
+        if not text:
+            self.skipped['нет текста'] += 1
+            return None
+        author_id = self.authors.get(row.get('author'))
+        if author_id is None:
+            self.skipped['неизвестный автор'] += 1
+            return None
+        group_id = None
+        if row.get('group'):
+            group_id = self.groups.get(row['group'])
+            if group_id is None:
+                self.skipped['неизвестная группа'] += 1
+                return None
+        pub_date = timezone.now()
+        if row.get('pub_date'):
+            pub_date = parse_pub_date(row['pub_date'])
+            if pub_date is None:
+                self.skipped['неверная дата'] += 1
+                return None
+        self.author_ids.add(author_id)
+        if group_id is not None:
+            self.group_ids.add(group_id)
+        return Post(text=text, author_id=author_id, group_id=group_id,
+                    pub_date=pub_date, updated_at=pub_date)
+
+    def insert(self, posts, batch_size):
+        """Вставляет посты пачками, не держа в памяти больше одной.
+
+        Вставка идёт в режиме raw, как у loaddata: значения полей
+        берутся из объектов как есть, и auto_now_add не подменяет
+        дату публикации из файла. Анонс заполняет триггер базы.
+        """
+        ops = connections[router.db_for_write(Post)].ops
+        count = 0
+        while True:
+            batch = list(itertools.islice(posts, batch_size))
+            if not batch:
+                return count
+            # Как bulk_create, не превышаем лимит параметров в запросе.
+            size = max(ops.bulk_batch_size(INSERT_FIELDS, batch), 1)
+            for start in range(0, len(batch), size):
+                Post.objects._insert(
+                    batch[start:start + size], fields=INSERT_FIELDS,
+                    raw=True)
+            count += len(batch)
+
+    def progress(self, imported, started):
+        elapsed = time.perf_counter() - started
+        rate = imported / elapsed if elapsed else 0
+        return f'{imported} строк за {elapsed:.1f} с ({rate:.0f} строк/с)'
+
+    def finish(self):
+        """Догоняет то, что bulk_create делает в обход сигналов."""
+        recount_posts()
+        follows = Follow.objects.filter(author_id__in=self.author_ids)
+        for follow in follows.iterator():
+            backfill_follow(follow)
+        bump_post_feeds(self.author_ids, self.group_ids)
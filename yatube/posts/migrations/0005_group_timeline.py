@@ -0,0 +1,68 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+TIMELINE_TRIGGERS = [
+    """
+    CREATE TRIGGER posts_timeline_insert AFTER INSERT ON posts_post
+    WHEN NEW.group_id IS NOT NULL
+    BEGIN
+        INSERT INTO posts_grouptimeline (post_id, group_id, pub_date)
+        VALUES (NEW.id, NEW.group_id, NEW.pub_date);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_timeline_update
+    AFTER UPDATE OF group_id, pub_date ON posts_post
+    BEGIN
+        DELETE FROM posts_grouptimeline WHERE post_id = OLD.id;
+        INSERT INTO posts_grouptimeline (post_id, group_id, pub_date)
+        SELECT NEW.id, NEW.group_id, NEW.pub_date
+        WHERE NEW.group_id IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER posts_timeline_delete AFTER DELETE ON posts_post
+    BEGIN
+        DELETE FROM posts_grouptimeline WHERE post_id = OLD.id;
+    END
+    """,
+    """
+    INSERT INTO posts_grouptimeline (post_id, group_id, pub_date)
+    SELECT id, group_id, pub_date FROM posts_post
+    WHERE group_id IS NOT NULL
+    """,
+]
+
+DROP_TIMELINE_TRIGGERS = [
+    'DROP TRIGGER IF EXISTS posts_timeline_insert',
+    'DROP TRIGGER IF EXISTS posts_timeline_update',
+    'DROP TRIGGER IF EXISTS posts_timeline_delete',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupTimeline',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='timeline_entry', serialize=False, to='posts.Post', verbose_name='Пост')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='timeline', to='posts.Group', verbose_name='Группа')),
+            ],
+            options={
+                'ordering': ['pub_date', 'post'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='grouptimeline',
+            index=models.Index(fields=['group', 'pub_date'], name='timeline_group_pub_date_idx'),
+        ),
+        migrations.RunSQL(TIMELINE_TRIGGERS, DROP_TIMELINE_TRIGGERS),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations
+
+SEARCH_TABLE = [
+    """
+    CREATE VIRTUAL TABLE posts_post_fts USING fts5(
+        text,
+        content='posts_post',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER posts_fts_insert AFTER INSERT ON posts_post
+    BEGIN
+        INSERT INTO posts_post_fts (rowid, text) VALUES (NEW.id, NEW.text);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_fts_update AFTER UPDATE OF text ON posts_post
+    BEGIN
+        INSERT INTO posts_post_fts (posts_post_fts, rowid, text)
+        VALUES ('delete', OLD.id, OLD.text);
+        INSERT INTO posts_post_fts (rowid, text) VALUES (NEW.id, NEW.text);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_fts_delete AFTER DELETE ON posts_post
+    BEGIN
+        INSERT INTO posts_post_fts (posts_post_fts, rowid, text)
+        VALUES ('delete', OLD.id, OLD.text);
+    END
+    """,
+    "INSERT INTO posts_post_fts (posts_post_fts) VALUES ('rebuild')",
+]
+
+DROP_SEARCH_TABLE = [
+    'DROP TRIGGER IF EXISTS posts_fts_insert',
+    'DROP TRIGGER IF EXISTS posts_fts_update',
+    'DROP TRIGGER IF EXISTS posts_fts_delete',
+    'DROP TABLE IF EXISTS posts_post_fts',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_group_timeline'),
+    ]
+
+    operations = [
+        migrations.RunSQL(SEARCH_TABLE, DROP_SEARCH_TABLE),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:52
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_follow_home_timeline'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='grouptimeline',
+            options={'ordering': ['pub_date', 'post_id']},
+        ),
+        migrations.AlterModelOptions(
+            name='hometimeline',
+            options={'ordering': ['pub_date', 'post_id']},
+        ),
+    ]
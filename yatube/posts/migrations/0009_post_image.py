@@ -0,0 +1,22 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:54
+
+from django.db import migrations, models
+
+from ._triggers import DROP_POST_TRIGGERS, POST_TRIGGERS
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_timeline_ordering'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DROP_POST_TRIGGERS, POST_TRIGGERS),
+        migrations.AddField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, upload_to='posts/', verbose_name='Картинка'),
+        ),
+        migrations.RunSQL(POST_TRIGGERS, DROP_POST_TRIGGERS),
+    ]
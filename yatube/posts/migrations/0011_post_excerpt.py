@@ -0,0 +1,28 @@
+from django.db import migrations, models
+
+from ._triggers import (DROP_EXCERPT_TRIGGERS, DROP_POST_TRIGGERS,
+                        EXCERPT_LENGTH_0011, EXCERPT_TRIGGERS, POST_TRIGGERS,
+                        excerpt_case)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DROP_POST_TRIGGERS, POST_TRIGGERS),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Анонс'),
+        ),
+        migrations.RunSQL(
+            'UPDATE posts_post SET excerpt = '
+            + excerpt_case(EXCERPT_LENGTH_0011, 'text'),
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(POST_TRIGGERS, DROP_POST_TRIGGERS),
+        migrations.RunSQL(EXCERPT_TRIGGERS, DROP_EXCERPT_TRIGGERS),
+    ]
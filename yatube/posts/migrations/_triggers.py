@@ -0,0 +1,108 @@
+"""Триггеры таблицы posts_post для миграций.
+
+SQLite пересоздаёт таблицу при добавлении и изменении столбцов,
+и её триггеры пропадают. Миграции, меняющие posts_post, снимают
+триггеры до изменения и создают их заново после. Начиная с
+0011_post_excerpt к ним относятся и EXCERPT_TRIGGERS.
+"""
+
+POST_TRIGGERS = [
+    """
+    CREATE TRIGGER posts_timeline_insert AFTER INSERT ON posts_post
+    WHEN NEW.group_id IS NOT NULL
+    BEGIN
+        INSERT INTO posts_grouptimeline (post_id, group_id, pub_date)
+        VALUES (NEW.id, NEW.group_id, NEW.pub_date);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_timeline_update
+    AFTER UPDATE OF group_id, pub_date ON posts_post
+    BEGIN
+        DELETE FROM posts_grouptimeline WHERE post_id = OLD.id;
+        INSERT INTO posts_grouptimeline (post_id, group_id, pub_date)
+        SELECT NEW.id, NEW.group_id, NEW.pub_date
+        WHERE NEW.group_id IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER posts_timeline_delete AFTER DELETE ON posts_post
+    BEGIN
+        DELETE FROM posts_grouptimeline WHERE post_id = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER posts_fts_insert AFTER INSERT ON posts_post
+    BEGIN
+        INSERT INTO posts_post_fts (rowid, text) VALUES (NEW.id, NEW.text);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_fts_update AFTER UPDATE OF text ON posts_post
+    BEGIN
+        INSERT INTO posts_post_fts (posts_post_fts, rowid, text)
+        VALUES ('delete', OLD.id, OLD.text);
+        INSERT INTO posts_post_fts (rowid, text) VALUES (NEW.id, NEW.text);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_fts_delete AFTER DELETE ON posts_post
+    BEGIN
+        INSERT INTO posts_post_fts (posts_post_fts, rowid, text)
+        VALUES ('delete', OLD.id, OLD.text);
+    END
+    """,
+]
+
+DROP_POST_TRIGGERS = [
+    'DROP TRIGGER IF EXISTS posts_timeline_insert',
+    'DROP TRIGGER IF EXISTS posts_timeline_update',
+    'DROP TRIGGER IF EXISTS posts_timeline_delete',
+    'DROP TRIGGER IF EXISTS posts_fts_insert',
+    'DROP TRIGGER IF EXISTS posts_fts_update',
+    'DROP TRIGGER IF EXISTS posts_fts_delete',
+]
+
+# Длина анонса, с которой триггеры создаёт 0011_post_excerpt.
+# Значение заморожено: миграции не должны зависеть от текущего кода.
+# После смены EXCERPT_LENGTH модели новая миграция пересоздаёт
+# триггеры через excerpt_triggers(<новая длина>).
+EXCERPT_LENGTH_0011 = 300
+
+
+def excerpt_case(length, text):
+    """SQL-выражение анонса текста text, как Truncator.chars(length)."""
+    return f"""CASE
+            WHEN length({text}) > {length}
+            THEN substr({text}, 1, {length - 1}) || '…'
+            ELSE {text} END"""
+
+
+def excerpt_triggers(length):
+    """Триггеры анонса для вставок и правок в обход Post.save():
+    bulk_create, queryset.update().
+    """
+    update = f"""
+        UPDATE posts_post SET excerpt = {excerpt_case(length, 'NEW.text')}
+        WHERE id = NEW.id;"""
+    return [
+        f"""
+    CREATE TRIGGER posts_excerpt_insert AFTER INSERT ON posts_post
+    WHEN NEW.excerpt = ''
+    BEGIN{update}
+    END
+    """,
+        f"""
+    CREATE TRIGGER posts_excerpt_update AFTER UPDATE OF text ON posts_post
+    BEGIN{update}
+    END
+    """,
+    ]
+
+
+EXCERPT_TRIGGERS = excerpt_triggers(EXCERPT_LENGTH_0011)
+
+DROP_EXCERPT_TRIGGERS = [
+    'DROP TRIGGER IF EXISTS posts_excerpt_insert',
+    'DROP TRIGGER IF EXISTS posts_excerpt_update',
+]
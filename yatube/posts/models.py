@@ -1,14 +1,23 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils.text import Truncator
 
 
 User = get_user_model()
 
+# Длина анонса поста в символах. Триггеры posts_excerpt_* созданы
+# миграцией с той же длиной (EXCERPT_LENGTH_0011 в
+# posts/migrations/_triggers.py); после её смены нужна миграция,
+# пересоздающая триггеры через excerpt_triggers().
+EXCERPT_LENGTH = 300
+
 
 class Group(models.Model):
     title = models.CharField(verbose_name='Заголовок', max_length=200)
     slug = models.SlugField(verbose_name='ссылка', unique=True)
     description = models.TextField(verbose_name='Описание')
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Количество постов', default=0, editable=False)
 
     def __str__(self) -> str:
         return self.title
@@ -19,6 +28,8 @@ class Post(models.Model):
                             help_text='Введите текст поста')
     pub_date = models.DateTimeField(
         verbose_name='Дата публикации', auto_now_add=True)
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения', auto_now=True)
     author = models.ForeignKey(
         User,
         verbose_name='Автор',
@@ -34,9 +45,150 @@ class Post(models.Model):
         on_delete=models.SET_NULL,
         related_name='posts', help_text='Введите группу для поста'
     )
+    image = models.ImageField(
+        verbose_name='Картинка',
+        upload_to='posts/',
+        blank=True
+    )
+    excerpt = models.TextField(
+        verbose_name='Анонс',
+        blank=True,
+        editable=False
+    )
 
     class Meta:
         ordering = ['pub_date']
+        indexes = [
+            models.Index(fields=['pub_date'], name='post_pub_date_idx'),
+            models.Index(fields=['author', 'pub_date'],
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=['group', 'pub_date'],
+                         name='post_group_pub_date_idx'),
+            models.Index(fields=['updated_at'], name='post_updated_at_idx'),
+            models.Index(fields=['author', 'updated_at'],
+                         name='post_author_updated_idx'),
+            models.Index(fields=['group', 'updated_at'],
+                         name='post_group_updated_idx'),
+        ]
 
     def __str__(self):
         return self.text[:15]
+
+    def save(self, *args, **kwargs):
+        self.excerpt = Truncator(self.text).chars(EXCERPT_LENGTH)
+        super().save(*args, **kwargs)
+
+
+class GroupTimeline(models.Model):
+    """Лента группы: id постов группы в порядке публикации.
+
+    Таблицу ведут триггеры базы из миграции 0005_group_timeline,
+    поэтому она остаётся согласованной и после bulk_create и update.
+    """
+    post = models.OneToOneField(
+        Post,
+        verbose_name='Пост',
+        primary_key=True,
+        on_delete=models.DO_NOTHING,
+        related_name='timeline_entry'
+    )
+    group = models.ForeignKey(
+        Group,
+        verbose_name='Группа',
+        on_delete=models.DO_NOTHING,
+        related_name='timeline'
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        ordering = ['pub_date', 'post_id']
+        indexes = [
+            models.Index(fields=['group', 'pub_date'],
+                         name='timeline_group_pub_date_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.group}: {self.post_id}'
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        verbose_name='Автор',
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='post_stats'
+    )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Количество постов', default=0)
+    followers_count = models.PositiveIntegerField(
+        verbose_name='Количество подписчиков', default=0)
+
+    def __str__(self):
+        return f'{self.author}: {self.posts_count}'
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name='Подписчик',
+        on_delete=models.CASCADE,
+        related_name='follower'
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='Автор',
+        on_delete=models.CASCADE,
+        related_name='following'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'], name='unique_follow'),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='no_self_follow'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} -> {self.author}'
+
+
+class HomeTimeline(models.Model):
+    """Домашняя лента подписчика, заполняемая при публикации поста."""
+    user = models.ForeignKey(
+        User,
+        verbose_name='Подписчик',
+        on_delete=models.CASCADE,
+        related_name='home_timeline'
+    )
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='Автор',
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        ordering = ['pub_date', 'post_id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_home_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'pub_date', 'post'],
+                         name='home_user_pub_date_idx'),
+            models.Index(fields=['user', 'author'],
+                         name='home_user_author_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user}: {self.post_id}'
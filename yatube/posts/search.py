@@ -0,0 +1,124 @@
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+from .utils import CursorPage, decode_cursor, encode_cursor
+
+SEARCH_TABLE = 'posts_post_fts'
+MARK_START, MARK_END = '\x02', '\x03'
+SNIPPET_TOKENS = 16
+
+
+def match_expression(query):
+    """Превращает ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово берётся в кавычки, поэтому операторы FTS5
+    во вводе не выполняются; слова объединяются через AND.
+    """
+    words = query.split()
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+def matching_ids(query):
+    """Подзапрос id постов, подходящих под запрос (для фильтра pk__in)."""
+    return RawSQL(
+        f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+        (match_expression(query),),
+    )
+
+
+def render_snippet(snippet):
+    """Экранирует фрагмент и подсвечивает найденные слова."""
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+class SearchPaginator(Paginator):
+    """Keyset-пагинация результатов поиска по ключу (rank, id).
+
+    Страница — один запрос к таблице FTS5 и один запрос постов по pk.
+    """
+
+    is_cursor = True
+
+    def __init__(self, query, per_page):
+        super().__init__([], per_page)
+        self.match = match_expression(query)
+
+    def _parse(self, token):
+        values = decode_cursor(token) if token else None
+        if values is None or len(values) != 2:
+            return None
+        try:
+            return float(values[0]), int(values[1])
+        except ValueError:
+            return None
+
+    def _search(self, values, backwards):
+        sign, order = ('<', 'DESC') if backwards else ('>', 'ASC')
+        sql = (
+            f'SELECT rowid, rank, snippet({SEARCH_TABLE}, 0, %s, %s, %s, %s) '
+            f'FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s'
+        )
+        params = [MARK_START, MARK_END, '…', SNIPPET_TOKENS, self.match]
+        if values is not None:
+            sql += (f' AND (rank {sign} %s'
+                    f' OR (rank = %s AND rowid {sign} %s))')
+            params += [values[0], values[0], values[1]]
+        sql += f' ORDER BY rank {order}, rowid {order} LIMIT %s'
+        params.append(self.per_page + 1)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def cursor_page(self, after=None, before=None):
+        """Возвращает страницу результатов после after или перед before."""
+        if not self.match:
+            return CursorPage([], self)
+        backwards = before is not None and after is None
+        values = self._parse(before if backwards else after)
+        if values is None:
+            backwards = False
+        rows = self._search(values, backwards)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+        posts = Post.objects.select_related('author', 'group').in_bulk(
+            [post_id for post_id, _, _ in rows])
+        results = []
+        for post_id, _, snippet in rows:
+            post = posts.get(post_id)
+            if post is not None:
+                post.snippet = render_snippet(snippet)
+                results.append(post)
+        if not rows:
+            return CursorPage(results, self)
+        first = encode_cursor((rows[0][1], rows[0][0]))
+        last = encode_cursor((rows[-1][1], rows[-1][0]))
+        if backwards:
+            return CursorPage(
+                results, self,
+                previous_cursor=first if has_more else None,
+                next_cursor=last if values is not None else None,
+            )
+        return CursorPage(
+            results, self,
+            previous_cursor=first if values is not None else None,
+            next_cursor=last if has_more else None,
+        )
+
+
+def rebuild_search_index():
+    """Перестраивает индекс FTS5 по текущему содержимому posts_post."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')")
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
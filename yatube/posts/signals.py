@@ -0,0 +1,158 @@
+from functools import partial
+
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from .caching import bump_feeds, invalidate_cards
+from .counters import change_author_count, change_group_count
+from .groups import invalidate_groups
+from .models import Follow, Group, Post, User
+from .thumbnails import schedule_thumbnails
+from .timeline import (backfill_follow, backfill_former_celebrity,
+                       drop_follow, fan_out_post)
+
+
+def author_scope(username):
+    return f'author:{username}'
+
+
+def group_scope(slug):
+    return f'group:{slug}'
+
+
+def bump_post_feeds(author_ids, group_ids):
+    """Устаревают главная лента и ленты затронутых авторов и групп."""
+    usernames = User.objects.filter(
+        pk__in=author_ids).values_list('username', flat=True)
+    slugs = Group.objects.filter(
+        pk__in=[pk for pk in group_ids if pk is not None]
+    ).values_list('slug', flat=True)
+    bump_feeds(
+        'global',
+        *map(author_scope, usernames),
+        *map(group_scope, slugs),
+    )
+
+
+def bump_author_page(author_id):
+    """Устаревает страница автора: на ней кнопка подписки."""
+    usernames = User.objects.filter(
+        pk=author_id).values_list('username', flat=True)
+    bump_feeds(*map(author_scope, usernames))
+
+
+def refresh_post_card(post):
+    """Сбрасывает закэшированную карточку, собранную без миниатюр."""
+    invalidate_cards([post.pk])
+    bump_post_feeds({post.author_id}, {post.group_id})
+
+
+@receiver(post_init, sender=Post)
+def remember_post_owners(sender, instance, **kwargs):
+    """Запоминает автора, группу и картинку поста, чтобы заметить
+    их смену.
+
+    Отложенные поля (defer, refresh_from_db) не запоминаются:
+    обращение к ним само загрузило бы экземпляр заново. При
+    сохранении такие поля считаются неизменёнными.
+    """
+    loaded = instance.__dict__
+    if 'author_id' in loaded:
+        instance._loaded_author_id = loaded['author_id']
+    if 'group_id' in loaded:
+        instance._loaded_group_id = loaded['group_id']
+    if 'image' in loaded:
+        image = loaded['image']
+        instance._loaded_image = getattr(image, 'name', image)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    old_author_id = getattr(
+        instance, '_loaded_author_id', instance.author_id)
+    old_group_id = getattr(instance, '_loaded_group_id', instance.group_id)
+    if created:
+        change_author_count(instance.author_id, 1)
+        change_group_count(instance.group_id, 1)
+        fan_out_post(instance)
+    else:
+        if old_author_id != instance.author_id:
+            change_author_count(old_author_id, -1)
+            change_author_count(instance.author_id, 1)
+        if old_group_id != instance.group_id:
+            change_group_count(old_group_id, -1)
+            change_group_count(instance.group_id, 1)
+    invalidate_cards([instance.pk])
+    bump_post_feeds(
+        {old_author_id, instance.author_id},
+        {old_group_id, instance.group_id},
+    )
+    old_image = getattr(instance, '_loaded_image', instance.image.name)
+    if instance.image and instance.image.name != old_image:
+        schedule_thumbnails(
+            instance.image.name, partial(refresh_post_card, instance))
+    remember_post_owners(sender, instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    change_author_count(instance.author_id, -1)
+    change_group_count(instance.group_id, -1)
+    invalidate_cards([instance.pk])
+    bump_post_feeds({instance.author_id}, {instance.group_id})
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, created, update_fields, **kwargs):
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    posts = instance.posts.order_by()
+    invalidate_cards(posts.values_list('pk', flat=True))
+    slugs = posts.filter(group__isnull=False).values_list(
+        'group__slug', flat=True).distinct()
+    bump_feeds(
+        'global',
+        author_scope(instance.username),
+        *map(group_scope, slugs),
+    )
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    if kwargs.get('created'):
+        return
+    posts = instance.posts.order_by()
+    invalidate_cards(posts.values_list('pk', flat=True))
+    usernames = posts.values_list('author__username', flat=True).distinct()
+    bump_feeds(
+        'global',
+        group_scope(instance.slug),
+        *map(author_scope, usernames),
+    )
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def refresh_group_registry(sender, instance, **kwargs):
+    invalidate_groups()
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw, **kwargs):
+    if raw or not created:
+        return
+    change_author_count(instance.author_id, 1, 'followers_count')
+    backfill_follow(instance)
+    bump_author_page(instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    change_author_count(instance.author_id, -1, 'followers_count')
+    drop_follow(instance)
+    backfill_former_celebrity(instance.author_id)
+    bump_author_page(instance.author_id)
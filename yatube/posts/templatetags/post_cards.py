@@ -0,0 +1,39 @@
+from django import template
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from posts.caching import CARD_TEMPLATE, card_cache, card_key
+from posts.thumbnails import srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts, separator='<hr>'):
+    """Собирает ленту из закэшированных карточек постов.
+
+    Все карточки страницы читаются из кэша одним get_many,
+    отрисовываются и сохраняются только недостающие.
+    """
+    posts = list(posts)
+    keys = {post.pk: card_key(post.pk) for post in posts}
+    cache = card_cache()
+    cached = cache.get_many(keys.values())
+    missing = {}
+    cards = []
+    for post in posts:
+        card = cached.get(keys[post.pk])
+        if card is None:
+            card = render_to_string(CARD_TEMPLATE, {'post': post})
+            missing[keys[post.pk]] = card
+        cards.append(card)
+    if missing:
+        cache.set_many(missing, settings.POST_CARD_TIMEOUT)
+    return mark_safe(separator.join(cards))
+
+
+@register.simple_tag
+def post_srcset(image):
+    """Адаптивные размеры картинки поста для атрибута srcset."""
+    return srcset(image)
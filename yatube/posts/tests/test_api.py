@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class PostApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.other = User.objects.create_user(username='OtherAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug')
+        Post.objects.bulk_create([
+            Post(author=cls.author, group=cls.group, text=f'Пост {i}')
+            for i in range(settings.AMOUNT_POSTS)
+        ])
+        cls.post = Post.objects.create(author=cls.other, text='Без группы')
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_feeds_page_by_cursor(self):
+        """Ленты API листаются курсором до конца без повторов."""
+        urls = {
+            reverse('api:posts'): settings.AMOUNT_POSTS + 1,
+            reverse('api:group_posts', args=['test-slug']):
+                settings.AMOUNT_POSTS,
+            reverse('api:author_posts', args=['OtherAuthor']): 1,
+        }
+        for url, total in urls.items():
+            with self.subTest(url=url):
+                seen = []
+                while url:
+                    data = self.client.get(url).json()
+                    seen += [record['id'] for record in data['results']]
+                    url = data['next']
+                self.assertEqual(len(seen), total)
+                self.assertEqual(len(set(seen)), total)
+
+    def test_sparse_fields_select_only_their_columns(self):
+        """fields= оставляет в ответе и в SQL только нужные поля."""
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(
+                reverse('api:posts'), {'fields': 'id,author'}).json()
+        self.assertEqual(set(data['results'][0]), {'id', 'author'})
+        page_sql = queries.captured_queries[-1]['sql']
+        self.assertIn('"auth_user"."username"', page_sql)
+        self.assertNotIn('"posts_post"."text"', page_sql)
+
+    def test_page_is_single_query_with_related_data(self):
+        """Страница с автором и группой читается одним запросом
+        (второй — Max(updated_at) для ETag и Last-Modified).
+        """
+        response = self.client.get(reverse('api:posts'), {'limit': 5})
+        self.assertEqual(len(response.json()['results']), 5)
+        with self.assertNumQueries(2):
+            self.client.get(response.json()['next'])
+
+    def test_post_detail(self):
+        data = self.client.get(
+            reverse('api:post_detail', args=[self.post.pk])).json()
+        self.assertEqual(data['text'], 'Без группы')
+        self.assertEqual(data['author'], 'OtherAuthor')
+        self.assertIsNone(data['group'])
+        self.assertIsNone(data['image'])
+
+    def test_errors(self):
+        response = self.client.get(reverse('api:posts'), {'fields': 'email'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.json()['error'])
+        response = self.client.get(
+            reverse('api:group_posts', args=['missing']))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,179 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Group, Post, User
+from ..urls import urlpatterns
+
+
+class BenchmarkCommandTests(TestCase):
+    def test_benchmark_seeds_and_reports_every_view(self):
+        """benchmark_posts заполняет базу и пишет замеры всех адресов."""
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = os.path.join(directory, 'baseline.json')
+            output = os.path.join(directory, 'output.json')
+            call_command(
+                'benchmark_posts', users=3, groups=2, posts=20,
+                requests=2, output=baseline, stdout=StringIO())
+            call_command(
+                'benchmark_posts', skip_seed=True, requests=2,
+                output=output, compare=baseline, stdout=StringIO())
+            with open(output) as results_file:
+                results = json.load(results_file)
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(Group.objects.count(), 2)
+        self.assertEqual(Post.objects.count(), 20)
+        expected = {f'posts:{pattern.name}' for pattern in urlpatterns}
+        self.assertEqual(set(results['views']), expected)
+        for stats in results['views'].values():
+            self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+        # Выгрузки дочитываются до конца, и их запросы попадают в замер.
+        for name in ('posts:profile_export', 'posts:group_export'):
+            with self.subTest(view=name):
+                self.assertGreater(results['views'][name]['queries'], 0)
+
+
+class ImportPostsCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug')
+
+    def import_file(self, name, content, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, name)
+            with open(path, 'w', encoding='utf-8') as source:
+                source.write(content)
+            out = StringIO()
+            call_command('import_posts', path, stdout=out, **options)
+        return out.getvalue()
+
+    def test_import_jsonl_in_batches(self):
+        """JSON Lines загружается пачками, даты и группы сохраняются."""
+        rows = [
+            {'text': f'Пост {i}', 'author': 'TestAuthor',
+             'group': 'test-slug', 'pub_date': f'2020-01-0{i + 1}T10:00'}
+            for i in range(5)
+        ]
+        rows.append({'text': 'Чужой', 'author': 'nobody'})
+        output = self.import_file(
+            'posts.jsonl',
+            '\n'.join(json.dumps(row, ensure_ascii=False) for row in rows),
+            batch_size=2, transaction_size=2,
+        )
+        posts = Post.objects.filter(group=self.group)
+        self.assertEqual(posts.count(), 5)
+        self.assertEqual(posts.first().pub_date.year, 2020)
+        self.assertEqual(self.group.timeline.count(), 5)
+        self.assertIn('строк/с', output)
+        self.assertIn('неизвестный автор', output)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 5)
+
+    def test_import_csv_without_group(self):
+        """CSV без группы и даты получает текущее время."""
+        self.import_file(
+            'posts.csv', 'text,author\nПервый,TestAuthor\nВторой,TestAuthor\n')
+        self.assertEqual(
+            Post.objects.filter(author=self.author, group=None).count(), 2)
+        self.assertTrue(Post._meta.get_field('pub_date').auto_now_add)
+
+    def test_import_keeps_model_metadata_untouched(self):
+        """Дата из файла сохраняется без подмены auto_now_add у модели."""
+        field = Post._meta.get_field('pub_date')
+        original = Post.objects._insert
+
+        def insert(*args, **kwargs):
+            self.assertTrue(field.auto_now_add)
+            return original(*args, **kwargs)
+
+        with mock.patch.object(Post.objects, '_insert', side_effect=insert):
+            self.import_file(
+                'posts.jsonl',
+                json.dumps({'text': 'Старый', 'author': 'TestAuthor',
+                            'pub_date': '2019-05-01T10:00'}))
+        post = Post.objects.get(text='Старый')
+        self.assertEqual(post.pub_date.year, 2019)
+        self.assertEqual(post.updated_at, post.pub_date)
+        self.assertEqual(post.excerpt, 'Старый')
+
+    def test_bad_json_lines_are_skipped_and_counters_reconciled(self):
+        """Испорченные строки пропускаются с номерами, остальное
+        загружается, а счётчики пересчитываются.
+        """
+        rows = [
+            json.dumps({'text': 'Первый', 'author': 'TestAuthor',
+                        'group': 'test-slug'}),
+            '{"text": "оборван',
+            '[1, 2]',
+            json.dumps({'text': 'Второй', 'author': 'TestAuthor',
+                        'group': 'test-slug'}),
+        ]
+        output = self.import_file('posts.jsonl', '\n'.join(rows))
+        self.assertEqual(Post.objects.filter(group=self.group).count(), 2)
+        self.assertIn('неверный JSON', output)
+        self.assertIn('Строки с неверным JSON: 2, 3', output)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 2)
+
+    def test_impossible_dates_and_many_bad_lines_are_skipped(self):
+        rows = ['не JSON'] * 25 + [
+            json.dumps({'text': 'Нет даты', 'author': 'TestAuthor',
+                        'pub_date': '2020-02-30T10:00'}),
+            json.dumps({'text': 'Есть дата', 'author': 'TestAuthor',
+                        'pub_date': '2020-02-28T10:00'}),
+        ]
+        output = self.import_file('posts.jsonl', '\n'.join(rows))
+        self.assertEqual(
+            list(Post.objects.values_list('text', flat=True)), ['Есть дата'])
+        self.assertIn('Пропущено (неверная дата): 1', output)
+        self.assertIn('Пропущено (неверный JSON): 25', output)
+        self.assertIn(
+            'Строки с неверным JSON: '
+            + ', '.join(map(str, range(1, 21))) + '…', output)
+
+    def test_counters_reconciled_when_import_fails(self):
+        """Если загрузка оборвалась, закоммиченные пачки всё равно
+        попадают в счётчики.
+        """
+        rows = '\n'.join(
+            json.dumps({'text': f'Пост {i}', 'author': 'TestAuthor',
+                        'group': 'test-slug'})
+            for i in range(4))
+        original = Post.objects._insert
+        calls = []
+
+        def fail_second_transaction(*args, **kwargs):
+            calls.append(1)
+            if len(calls) > 1:
+                raise RuntimeError('диск переполнен')
+            return original(*args, **kwargs)
+
+        with mock.patch.object(
+                Post.objects, '_insert', side_effect=fail_second_transaction):
+            with self.assertRaises(RuntimeError):
+                self.import_file('posts.jsonl', rows,
+                                 batch_size=2, transaction_size=1)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 2)
+
+
+class ExportPostsCommandTests(TestCase):
+    def test_export_round_trips_through_import(self):
+        """Выгрузка автора в CSV загружается обратно import_posts."""
+        author = User.objects.create_user(username='TestAuthor')
+        Post.objects.bulk_create(
+            Post(author=author, text=f'Пост {i}') for i in range(3))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'posts.csv')
+            call_command('export_posts', author='TestAuthor',
+                         format='csv', output=path, stdout=StringIO())
+            call_command('import_posts', path, stdout=StringIO())
+        self.assertEqual(author.posts.count(), 6)
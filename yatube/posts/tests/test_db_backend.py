@@ -0,0 +1,73 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.db import connection
+from django.test import SimpleTestCase
+
+from core.db_backends.sqlite3.base import DatabaseWrapper
+
+THREADS = 8
+
+
+class SQLiteBackendTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_dict = {
+            **connection.settings_dict,
+            'NAME': os.path.join(directory.name, 'db.sqlite3'),
+            'OPTIONS': {'pragmas': {'busy_timeout': 10000}},
+        }
+        with self.connect().cursor() as cursor:
+            cursor.execute('CREATE TABLE counter (value INTEGER)')
+
+    def connect(self):
+        wrapper = DatabaseWrapper(self.settings_dict, alias='backend_test')
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_connection_pragmas(self):
+        """Соединение открывается в WAL с настройками из OPTIONS."""
+        with self.connect().cursor() as cursor:
+            pragmas = {
+                name: cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                for name in ('journal_mode', 'synchronous', 'busy_timeout')
+            }
+        self.assertEqual(
+            pragmas,
+            {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 10000},
+        )
+
+    def test_concurrent_writers_queue_instead_of_failing(self):
+        """Транзакции чтение-затем-запись из разных потоков не падают
+        с «database is locked», а выполняются по очереди.
+        """
+        errors = []
+
+        def write():
+            wrapper = DatabaseWrapper(self.settings_dict, alias='writer')
+            try:
+                wrapper._start_transaction_under_autocommit()
+                with wrapper.cursor() as cursor:
+                    cursor.execute('SELECT COUNT(*) FROM counter')
+                    time.sleep(0.01)
+                    cursor.execute('INSERT INTO counter VALUES (1)')
+                wrapper.commit()
+                with wrapper.cursor() as cursor:
+                    cursor.execute('INSERT INTO counter VALUES (1)')
+            except Exception as error:
+                errors.append(error)
+            finally:
+                wrapper.close()
+
+        threads = [threading.Thread(target=write) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        with self.connect().cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM counter')
+            self.assertEqual(cursor.fetchone()[0], THREADS * 2)
@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import resolve, reverse
+
+from core.middleware import REPLICA_PIN_COOKIE, ReplicaRoutingMiddleware
+
+from ..models import Post
+
+
+@override_settings(REPLICA_DATABASE='replica')
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def run_view(self, request, view):
+        """Прогоняет запрос через middleware с подставным view."""
+        request.resolver_match = resolve(request.path)
+
+        def handler(request):
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware = ReplicaRoutingMiddleware(handler)
+        return middleware(request)
+
+    def reading_view(self, request):
+        return HttpResponse(router.db_for_read(Post))
+
+    def writing_view(self, request):
+        router.db_for_write(Post)
+        return HttpResponse(router.db_for_read(Post))
+
+    def test_feed_reads_go_to_replica(self):
+        """Ленты читаются с реплики, остальные страницы — с основной."""
+        urls = {
+            reverse('posts:index'): b'replica',
+            reverse('posts:post_detail', args=[1]): b'replica',
+            reverse('posts:search'): b'default',
+        }
+        for url, alias in urls.items():
+            with self.subTest(url=url):
+                response = self.run_view(
+                    self.factory.get(url), self.reading_view)
+                self.assertEqual(response.content, alias)
+        self.assertEqual(router.db_for_read(Post), 'default')
+
+    def test_write_pins_user_to_primary(self):
+        """После записи пользователь читает ленты с основной базы."""
+        response = self.run_view(
+            self.factory.post(reverse('posts:create')), self.writing_view)
+        self.assertIn(REPLICA_PIN_COOKIE, response.cookies)
+        request = self.factory.get(reverse('posts:index'))
+        request.COOKIES[REPLICA_PIN_COOKIE] = '1'
+        response = self.run_view(request, self.reading_view)
+        self.assertEqual(response.content, b'default')
+
+    def test_writes_always_go_to_primary(self):
+        """Попутная запись в GET-запросе идёт на основную базу,
+        но не закрепляет за ней пользователя.
+        """
+        response = self.run_view(
+            self.factory.get(reverse('posts:index')), self.writing_view)
+        self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_session_and_user_writes_do_not_pin(self):
+        def login_view(request):
+            router.db_for_write(Session)
+            router.db_for_write(get_user_model())
+            return HttpResponse()
+
+        response = self.run_view(
+            self.factory.post(reverse('users:login')), login_view)
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_session_and_user_read_from_primary(self):
+        """На страницах с реплики сессия и пользователь читаются
+        с основной базы.
+        """
+        def view(request):
+            return HttpResponse(' '.join(
+                router.db_for_read(model)
+                for model in (Session, get_user_model(), Post)))
+
+        response = self.run_view(
+            self.factory.get(reverse('posts:index')), view)
+        self.assertEqual(response.content, b'default default replica')
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_without_replica_nothing_changes(self):
+        response = self.run_view(
+            self.factory.get(reverse('posts:index')), self.writing_view)
+        self.assertEqual(response.content, b'default')
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
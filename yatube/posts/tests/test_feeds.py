@@ -0,0 +1,87 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.test_runner import clear_caches
+
+from ..caching import version_cache, version_key
+from ..models import Group, Post, User
+
+
+@override_settings(SYNDICATION_ITEMS=5)
+class SyndicationFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug')
+        for i in range(7):
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост номер {i}')
+
+    def setUp(self):
+        clear_caches()
+        self.guest_client = Client()
+        self.feeds = {
+            reverse('posts:rss'): 'application/rss+xml',
+            reverse('posts:atom'): 'application/atom+xml',
+            reverse('posts:group_rss', args=['test-slug']):
+                'application/rss+xml',
+            reverse('posts:group_atom', args=['test-slug']):
+                'application/atom+xml',
+            reverse('posts:author_rss', args=['TestAuthor']):
+                'application/rss+xml',
+            reverse('posts:author_atom', args=['TestAuthor']):
+                'application/atom+xml',
+        }
+
+    def test_feeds_list_latest_posts(self):
+        """Ленты отдают только последние SYNDICATION_ITEMS постов."""
+        for url, content_type in self.feeds.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertTrue(response['Content-Type'].startswith(
+                    content_type))
+                self.assertContains(response, 'Пост номер 6')
+                self.assertContains(response, 'Пост номер 2')
+                self.assertNotContains(response, 'Пост номер 1')
+
+    def test_feeds_are_cached_and_revalidated(self):
+        """Повторный запрос берётся из кэша, с валидаторами — 304."""
+        for url in self.feeds:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                with self.assertNumQueries(0):
+                    self.guest_client.get(url)
+                    repeated = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(repeated.status_code, 304)
+
+    def test_new_post_refreshes_cached_feeds(self):
+        for url in self.feeds:
+            self.guest_client.get(url)
+        Post.objects.create(
+            author=self.author, group=self.group, text='Свежий пост')
+        for url in self.feeds:
+            with self.subTest(url=url):
+                self.assertContains(self.guest_client.get(url), 'Свежий пост')
+
+    def test_write_in_other_process_refreshes_cached_feeds(self):
+        """Лента из кэша процесса устаревает, как только другой процесс
+        поднимет версию в общем кэше.
+        """
+        for url in self.feeds:
+            self.guest_client.get(url)
+        # Так пост создаёт другой процесс: сигналы этого не срабатывают.
+        Post.objects.bulk_create([Post(
+            author=self.author, group=self.group, text='Чужой пост')])
+        for scope in ('global', 'group:test-slug', 'author:TestAuthor'):
+            version_cache().incr(version_key(scope))
+        for url in self.feeds:
+            with self.subTest(url=url):
+                self.assertContains(self.guest_client.get(url), 'Чужой пост')
+
+    def test_unknown_group_feed_is_404(self):
+        response = self.guest_client.get(
+            reverse('posts:group_rss', args=['missing']))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,79 @@
+from http import HTTPStatus
+
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.test_runner import clear_caches
+
+from ..groups import GroupRegistry, group_registry
+from ..models import Group, Post, User
+
+
+class GroupRegistryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='pass')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='Описание')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {i}', group=cls.group)
+            for i in range(3))
+
+    def setUp(self):
+        clear_caches()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def group_queries(self, url):
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, [query['sql'] for query in queries.captured_queries
+                          if 'FROM "posts_group"' in query['sql']]
+
+    def test_pages_do_not_query_groups(self):
+        """Страница группы, форма поста и список постов в админке
+        берут группы из реестра.
+        """
+        urls = (
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:create'),
+            reverse('admin:posts_post_changelist'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response, queries = self.group_queries(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertEqual(queries, [])
+
+    def test_form_choices_come_from_registry(self):
+        response = self.client.get(reverse('posts:create'))
+        choices = list(response.context['form'].fields['group'].choices)
+        self.assertEqual(choices[1], (self.group.pk, self.group.title))
+
+    def test_registry_follows_group_changes(self):
+        """Новая группа видна сразу, удалённая сразу пропадает."""
+        self.assertIsNone(group_registry.get('new-slug'))
+        group = Group.objects.create(
+            title='Новая', slug='new-slug', description='Описание')
+        url = reverse('posts:group_list', args=['new-slug'])
+        self.assertEqual(self.client.get(url).status_code, HTTPStatus.OK)
+        group.title = 'Переименована'
+        group.save()
+        self.assertEqual(group_registry.get('new-slug').title, 'Переименована')
+        group.delete()
+        self.assertEqual(
+            self.client.get(url).status_code, HTTPStatus.NOT_FOUND)
+
+    def test_other_process_sees_group_changes(self):
+        """Реестр другого процесса перечитывает группы после изменения."""
+        other = GroupRegistry()
+        self.assertEqual(other.get('test-slug').title, 'Тестовая группа')
+        Group.objects.filter(pk=self.group.pk).update(title='Другая')
+        self.assertEqual(other.get('test-slug').title, 'Тестовая группа')
+        group = Group.objects.get(pk=self.group.pk)
+        group.save()
+        self.assertEqual(other.get('test-slug').title, 'Другая')
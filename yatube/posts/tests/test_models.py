@@ -1,6 +1,10 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils.text import Truncator
 
-from ..models import Group, Post, User
+from ..models import EXCERPT_LENGTH, AuthorStats, Group, Post, User
 
 
 class PostModelTest(TestCase):
@@ -56,3 +60,96 @@ class PostModelTest(TestCase):
                 print(post._meta.get_field(field).help_text)
                 self.assertEqual(
                     post._meta.get_field(field).help_text, expected)
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.group_2 = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test-slug-2',
+            description='Тестовое описание 2',
+        )
+
+    def get_counts(self):
+        self.group.refresh_from_db()
+        self.group_2.refresh_from_db()
+        stats = AuthorStats.objects.get(author=self.user)
+        return (stats.posts_count, self.group.posts_count,
+                self.group_2.posts_count)
+
+    def test_counters_follow_create_edit_delete(self):
+        """Счётчики меняются при создании, смене группы и удалении."""
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group)
+        Post.objects.create(author=self.user, text='Второй пост')
+        self.assertEqual(self.get_counts(), (2, 1, 0))
+        post.group = self.group_2
+        post.save()
+        self.assertEqual(self.get_counts(), (2, 0, 1))
+        post.delete()
+        self.assertEqual(self.get_counts(), (1, 0, 0))
+
+    def test_recount_command_repairs_drift(self):
+        """Команда recount_posts исправляет разошедшиеся счётчики."""
+        Post.objects.bulk_create([
+            Post(author=self.user, text=f'Пост {i}', group=self.group)
+            for i in range(3)
+        ])
+        call_command('recount_posts', stdout=StringIO())
+        self.assertEqual(self.get_counts(), (3, 3, 0))
+
+
+class PostExcerptTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.long_text = 'слово ' * EXCERPT_LENGTH
+
+    def assertExcerpt(self, post):
+        self.assertEqual(len(post.excerpt), EXCERPT_LENGTH)
+        self.assertTrue(post.excerpt.endswith('…'))
+        self.assertTrue(self.long_text.startswith(post.excerpt[:-1]))
+
+    def test_excerpt_computed_on_save(self):
+        """Анонс длинного поста обрезается, короткий совпадает с текстом."""
+        post = Post.objects.create(author=self.author, text=self.long_text)
+        self.assertExcerpt(post)
+        post.text = 'Короткий текст'
+        post.save()
+        self.assertEqual(
+            Post.objects.get(pk=post.pk).excerpt, 'Короткий текст')
+
+    def test_excerpt_filled_for_bulk_writes(self):
+        """Триггеры заполняют анонс при bulk_create и update()."""
+        Post.objects.bulk_create([
+            Post(author=self.author, text=self.long_text)])
+        post = Post.objects.get()
+        self.assertEqual(
+            post.excerpt, Truncator(self.long_text).chars(EXCERPT_LENGTH))
+        Post.objects.update(text='Короткий текст')
+        self.assertEqual(Post.objects.get().excerpt, 'Короткий текст')
+
+    def test_trigger_matches_truncator_at_boundary(self):
+        """Триггер и Truncator обрезают одинаково на границе длины."""
+        for length in (EXCERPT_LENGTH - 1, EXCERPT_LENGTH,
+                       EXCERPT_LENGTH + 1):
+            with self.subTest(length=length):
+                text = 'я' * length
+                Post.objects.bulk_create([
+                    Post(author=self.author, text=text)])
+                post = Post.objects.latest('pk')
+                self.assertEqual(
+                    post.excerpt, Truncator(text).chars(EXCERPT_LENGTH))
+                Post.objects.filter(pk=post.pk).update(text=text + ' ')
+                self.assertEqual(
+                    Post.objects.get(pk=post.pk).excerpt,
+                    Truncator(text + ' ').chars(EXCERPT_LENGTH))
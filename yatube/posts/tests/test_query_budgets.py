@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Follow, Group, Post, User
+
+
+class QueryBudgetTests(TestCase):
+    """Страницы не превышают бюджет SQL-запросов из настроек."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.follower = User.objects.create_user(username='TestFollower')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([
+            Post(author=cls.author, text=f'Тестовый пост {i}',
+                 group=cls.group)
+            for i in range(settings.AMOUNT_POSTS)
+        ])
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        Follow.objects.create(user=cls.author, author=cls.follower)
+        Follow.objects.create(user=cls.follower, author=cls.author)
+        cls.urls = {
+            'posts:index': reverse('posts:index'),
+            'posts:group_list': reverse(
+                'posts:group_list', kwargs={'slug': cls.group.slug}),
+            'posts:profile': reverse(
+                'posts:profile', kwargs={'username': cls.author}),
+            'posts:post_detail': reverse(
+                'posts:post_detail', kwargs={'post_id': cls.post.pk}),
+            'posts:follow_index': reverse('posts:follow_index'),
+            'posts:search': reverse('posts:search') + '?q=пост',
+            'posts:create': reverse('posts:create'),
+            'posts:post_edit': reverse(
+                'posts:post_edit', kwargs={'post_id': cls.post.pk}),
+            'api:posts': reverse('api:posts'),
+            'api:group_posts': reverse(
+                'api:group_posts', kwargs={'slug': cls.group.slug}),
+            'api:author_posts': reverse(
+                'api:author_posts', kwargs={'username': cls.author}),
+            'api:post_detail': reverse(
+                'api:post_detail', kwargs={'post_id': cls.post.pk}),
+        }
+
+    def setUp(self):
+        self.authorized_client_author = Client()
+        self.authorized_client_author.force_login(QueryBudgetTests.author)
+
+    def test_every_budgeted_view_is_checked(self):
+        """Для каждого бюджета из настроек есть проверяемый адрес."""
+        self.assertEqual(set(settings.SQL_QUERY_BUDGETS), set(self.urls))
+
+    def test_views_stay_within_query_budget(self):
+        """Число SQL-запросов страниц не выше бюджета."""
+        for view_name, url in self.urls.items():
+            for page in ('', 'page=2', 'after='):
+                with self.subTest(view_name=view_name, page=page):
+                    separator = '&' if '?' in url else '?'
+                    response = self.authorized_client_author.get(
+                        url + separator + page)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertLessEqual(
+                        int(response['X-DB-Queries']),
+                        settings.SQL_QUERY_BUDGETS[view_name],
+                    )
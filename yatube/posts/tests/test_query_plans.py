@@ -0,0 +1,98 @@
+import re
+
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Follow, Group, Post, User
+from ..utils import encode_cursor
+
+FULL_SCAN = re.compile(r'\bSCAN (TABLE )?posts_\w+\b(?! USING)')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+@override_settings(FEED_PAGE_TIMEOUT=0)
+class FeedQueryPlanTests(TestCase):
+    """Запросы лент к таблицам posts должны идти по индексам."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def get_plans(self, url, data=None, client=None):
+        client = client or self.guest_client
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url, data)
+        plans = {}
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if 'posts_post' not in sql or not sql.startswith('SELECT'):
+                    continue
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                plans[sql] = '\n'.join(row[-1] for row in cursor.fetchall())
+        return plans
+
+    def test_feed_queries_use_indexes(self):
+        """Страницы и RSS лент и post_detail не сканируют
+        таблицу постов целиком и не сортируют во временном B-tree.
+        """
+        cursor = encode_cursor((self.post.pub_date, self.post.pk))
+        urls = (
+            (reverse('posts:index'), None),
+            (reverse('posts:index'), {'after': cursor}),
+            (reverse('posts:index'), {'before': cursor}),
+            (reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+             None),
+            (reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+             {'after': cursor}),
+            (reverse('posts:profile',
+                     kwargs={'username': self.author.username}), None),
+            (reverse('posts:profile',
+                     kwargs={'username': self.author.username}),
+             {'after': cursor}),
+            (reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+             None),
+            (reverse('posts:rss'), None),
+            (reverse('posts:group_rss', kwargs={'slug': self.group.slug}),
+             None),
+            (reverse('posts:author_rss',
+                     kwargs={'username': self.author.username}), None),
+        )
+        for url, data in urls:
+            plans = self.get_plans(url, data)
+            self.assertTrue(plans, f'{url} не обращается к posts_post')
+            for sql, plan in plans.items():
+                with self.subTest(url=url, data=data, sql=sql):
+                    self.assertIsNone(FULL_SCAN.search(plan), plan)
+                    self.assertNotIn(TEMP_SORT, plan)
+
+    def test_home_feed_uses_indexes(self):
+        """Домашняя лента читается из HomeTimeline по индексу."""
+        follower = User.objects.create_user(username='TestFollower')
+        Follow.objects.create(user=follower, author=self.author)
+        client = Client()
+        client.force_login(follower)
+        cursor = encode_cursor((self.post.pub_date, self.post.pk))
+        for data in (None, {'after': cursor}):
+            plans = self.get_plans(
+                reverse('posts:follow_index'), data, client)
+            for sql, plan in plans.items():
+                with self.subTest(data=data, sql=sql):
+                    self.assertIsNone(FULL_SCAN.search(plan), plan)
+                    self.assertNotIn(TEMP_SORT, plan)
@@ -0,0 +1,85 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post, User
+
+
+class SearchViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Кот <b>спит</b> на диване',
+        )
+        Post.objects.bulk_create([
+            Post(author=cls.author, text=f'Пост про собак номер {i}')
+            for i in range(settings.AMOUNT_POSTS)
+        ])
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, query, **params):
+        return self.guest_client.get(
+            reverse('posts:search'), {'q': query, **params})
+
+    def test_search_returns_ranked_snippets(self):
+        """Поиск находит пост и подсвечивает слово в экранированном
+        фрагменте.
+        """
+        response = self.search('диване')
+        page_obj = response.context['page_obj']
+        self.assertEqual(list(page_obj), [self.post])
+        self.assertContains(response, '<mark>диване</mark>')
+        self.assertContains(response, '&lt;b&gt;')
+
+    def test_search_index_follows_edits_and_deletes(self):
+        """Правка и удаление поста сразу видны в поиске."""
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Кот переехал на кресло'
+        post.save()
+        self.assertFalse(self.search('диване').context['page_obj'])
+        self.assertTrue(self.search('кресло').context['page_obj'])
+        post.delete()
+        self.assertFalse(self.search('кресло').context['page_obj'])
+
+    def test_search_pages_by_cursor(self):
+        """Результаты листаются курсором без повторов."""
+        first_page = self.search('собак').context['page_obj']
+        self.assertEqual(len(first_page), settings.NUMBER_OBJECTS)
+        second_page = self.search(
+            'собак', after=first_page.next_cursor).context['page_obj']
+        self.assertEqual(len(second_page), settings.LEN_PAGE_OBJ)
+        self.assertFalse(second_page.has_next())
+        found = set(first_page) | set(second_page)
+        self.assertEqual(len(found), settings.AMOUNT_POSTS)
+
+    def test_search_ignores_query_syntax(self):
+        """Операторы FTS5 во вводе не ломают поиск."""
+        for query in ('"кот', 'кот OR', 'NEAR(', '*', ''):
+            with self.subTest(query=query):
+                response = self.search(query)
+                self.assertEqual(response.status_code, 200)
+
+    def test_admin_search_uses_full_text_index(self):
+        """Поиск в админке находит посты по словам текста."""
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@test.ru', password='pass')
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'диване'})
+        self.assertEqual(
+            list(response.context['cl'].result_list), [self.post])
+
+    def test_rebuild_command_restores_index(self):
+        """Команда rebuild_search_index восстанавливает индекс."""
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(
+            list(self.search('диване').context['page_obj']), [self.post])
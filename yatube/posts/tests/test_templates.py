@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.template import engines
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.template_cache import preload_templates
+
+from ..models import Group, Post, User
+
+CACHED_TEMPLATES = [{
+    **settings.TEMPLATES[0],
+    'OPTIONS': {
+        **settings.TEMPLATES[0]['OPTIONS'],
+        'loaders': [(
+            'django.template.loaders.cached.Loader',
+            ['django.template.loaders.filesystem.Loader'],
+        )],
+    },
+}]
+
+
+@override_settings(FEED_PAGE_TIMEOUT=0, TEMPLATE_TIMING=True)
+class TemplateTimingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug')
+        Post.objects.create(
+            author=cls.author, group=cls.group, text='Тестовый пост')
+
+    def test_server_timing_lists_templates_and_includes(self):
+        """Заголовок Server-Timing перечисляет шаблон страницы,
+        базовый шаблон и все include.
+        """
+        response = Client().get(
+            reverse('posts:group_list', args=['test-slug']))
+        timing = response['Server-Timing']
+        for name in ('posts/group_list.html', 'base.html',
+                     'includes/header.html', 'includes/footer.html',
+                     'posts/includes/paginator.html'):
+            with self.subTest(template=name):
+                self.assertIn(f'desc="{name}"', timing)
+
+    @override_settings(TEMPLATE_TIMING=False)
+    def test_timing_can_be_disabled(self):
+        response = Client().get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+@override_settings(TEMPLATES=CACHED_TEMPLATES)
+class TemplatePreloadTests(TestCase):
+    def test_preload_fills_cached_loader(self):
+        """Все шаблоны проекта разобраны до первого запроса."""
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertEqual(loader.get_template_cache, {})
+        loaded = preload_templates()
+        self.assertIn('posts/index.html', loader.get_template_cache)
+        self.assertIn('includes/header.html', loader.get_template_cache)
+        self.assertEqual(len(loader.get_template_cache), loaded)
@@ -0,0 +1,131 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.images import ImageFile
+
+from core.test_runner import clear_caches
+
+from .. import thumbnails
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POST_THUMBNAIL_WORKERS=0)
+class PostThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        clear_caches()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+        # sorl-thumbnail 12.6 обращается к Image.ANTIALIAS, которого нет
+        # в Pillow 10+; в Pillow 9 это тот же фильтр LANCZOS.
+        antialias = mock.patch.object(
+            Image, 'ANTIALIAS', Image.LANCZOS, create=True)
+        antialias.start()
+        self.addCleanup(antialias.stop)
+
+    def upload(self, name='small.gif'):
+        return SimpleUploadedFile(name, SMALL_GIF, content_type='image/gif')
+
+    def test_upload_precomputes_every_size(self):
+        """Форма сохраняет картинку, а все размеры нарезаются сразу."""
+        response = self.authorized_client.post(
+            reverse('posts:create'),
+            {'text': 'Пост с картинкой', 'image': self.upload()},
+        )
+        self.assertRedirects(
+            response, reverse('posts:profile', args=[self.author]))
+        post = Post.objects.get(text='Пост с картинкой')
+        self.assertTrue(post.image.name.startswith('posts/small'))
+        for geometry, options in settings.POST_THUMBNAIL_SPECS:
+            with self.subTest(geometry=geometry):
+                thumbnail = default.backend.get_thumbnail(
+                    post.image, geometry, **options)
+                self.assertNotEqual(thumbnail.name, post.image.name)
+                self.assertTrue(thumbnail.exists())
+
+    def test_feed_render_never_resizes(self):
+        """Лента не режет картинки сама, пока миниатюр нет."""
+        with mock.patch('posts.signals.schedule_thumbnails'):
+            post = Post.objects.create(
+                author=self.author, text='Без миниатюр', image=self.upload())
+        with mock.patch.object(
+                ThumbnailBackend, 'get_thumbnail') as resize, \
+                mock.patch('posts.thumbnails.schedule_thumbnails') as queue:
+            response = self.authorized_client.get(reverse('posts:index'))
+        resize.assert_not_called()
+        queue.assert_called_with(post.image.name)
+        self.assertContains(response, post.image.url)
+
+    def test_thumbnail_name_matches_sorl(self):
+        """Имя, под которым бэкенд ищет миниатюру, совпадает с именем,
+        которое даёт sorl-thumbnail при нарезке.
+        """
+        with mock.patch('posts.signals.schedule_thumbnails'):
+            post = Post.objects.create(
+                author=self.author, text='Пост', image=self.upload())
+        backend = default.backend
+        source = ImageFile(post.image)
+        for geometry, options in settings.POST_THUMBNAIL_SPECS:
+            with self.subTest(geometry=geometry):
+                created = ThumbnailBackend().get_thumbnail(
+                    post.image, geometry, **options)
+                name = backend._get_thumbnail_filename(
+                    source, geometry, backend._full_options(source, options))
+                self.assertEqual(name, created.name)
+
+    def test_missing_thumbnails_looked_up_once(self):
+        """Пока миниатюры режутся, хранилище sorl не опрашивается
+        на каждой отрисовке.
+        """
+        with mock.patch('posts.signals.schedule_thumbnails'):
+            post = Post.objects.create(
+                author=self.author, text='Пост', image=self.upload())
+        with mock.patch('posts.thumbnails.schedule_thumbnails') as queue:
+            with self.assertNumQueries(1):
+                for geometry, options in settings.POST_THUMBNAIL_SPECS:
+                    thumbnail = default.backend.get_thumbnail(
+                        post.image, geometry, **options)
+                    self.assertEqual(thumbnail.name, post.image.name)
+            with CaptureQueriesContext(connection) as queries:
+                self.authorized_client.get(reverse('posts:index'))
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if 'thumbnail_kvstore' in query['sql']])
+        queue.assert_called_once_with(post.image.name)
+
+    @override_settings(POST_THUMBNAIL_WORKERS=2)
+    def test_rolled_back_upload_leaves_queue_free(self):
+        """Отменённая транзакция не занимает место в очереди нарезки."""
+        with transaction.atomic():
+            thumbnails.schedule_thumbnails('posts/rolled-back.gif')
+            transaction.set_rollback(True)
+        self.assertNotIn('posts/rolled-back.gif', thumbnails._in_flight)
@@ -1,9 +1,10 @@
 from http import HTTPStatus
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from ..models import Group, Post, User
 
 
+@override_settings(FEED_PAGE_TIMEOUT=0)
 class StaticURLTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -1,10 +1,23 @@
+import csv
+import io
+import json
+
 from django import forms
-from django.test import Client, TestCase
+from django.db import connection
+from django.template import Context, Template
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.conf import settings
-from ..models import Group, Post, User
+
+from core.test_runner import clear_caches
+
+from ..models import Follow, Group, HomeTimeline, Post, User
+from ..caching import card_cache, card_key, version_cache, version_key
+from ..utils import CursorPaginator, NoPageNumber
 
 
+@override_settings(FEED_PAGE_TIMEOUT=0)
 class PostTests(TestCase):
     def get_info(self, post, post_2):
         post_text = post.text
@@ -148,7 +161,22 @@ class PostTests(TestCase):
             reverse('posts:group_list', kwargs={'slug': self.group.slug}))
         self.assertIn(self.post, response.context['page_obj'])
 
+    def test_post_moves_to_new_group_page(self):
+        """После смены группы пост пропадает из ленты старой группы
+        и появляется в ленте новой.
+        """
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = self.group_2
+        post.save()
+        old_group = self.client.get(
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}))
+        new_group = self.client.get(
+            reverse('posts:group_list', kwargs={'slug': self.group_2.slug}))
+        self.assertNotIn(post, old_group.context['page_obj'])
+        self.assertIn(post, new_group.context['page_obj'])
 
+
+@override_settings(FEED_PAGE_TIMEOUT=0)
 class PaginatorViewsTest(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -203,3 +231,433 @@ class PaginatorViewsTest(TestCase):
             response = self.client.get(url)
             amount_posts = len(response.context.get('page_obj').object_list)
             self.assertEqual(amount_posts, settings.LEN_PAGE_OBJ)
+
+    def test_cursor_pages_walk_forward_and_back(self):
+        """Курсорные ссылки ?after= и ?before= листают ленту
+        без пропусков и повторов.
+        """
+        url = reverse('posts:index')
+        first_page = self.client.get(url).context['page_obj']
+        self.assertEqual(len(first_page), settings.NUMBER_OBJECTS)
+        self.assertFalse(first_page.has_previous())
+        second_page = self.client.get(
+            url, {'after': first_page.next_cursor}
+        ).context['page_obj']
+        self.assertEqual(len(second_page), settings.LEN_PAGE_OBJ)
+        self.assertFalse(second_page.has_next())
+        seen = list(first_page) + list(second_page)
+        self.assertEqual(len(set(seen)), settings.AMOUNT_POSTS)
+        back_page = self.client.get(
+            url, {'before': second_page.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(list(back_page), list(first_page))
+
+    def test_cursor_page_ignores_broken_token(self):
+        """Испорченный курсор открывает первую страницу."""
+        response = self.client.get(
+            reverse('posts:index'), {'after': 'broken'}
+        )
+        self.assertEqual(
+            len(response.context['page_obj']), settings.NUMBER_OBJECTS
+        )
+
+    def test_cursor_page_has_no_page_numbers(self):
+        """Номерные методы Page у курсорной страницы не падают с
+        TypeError, а сообщают, что номеров нет.
+        """
+        page = CursorPaginator(
+            Post.objects.all(), settings.NUMBER_OBJECTS
+        ).cursor_page()
+        self.assertIsNone(page.number)
+        methods = (
+            page.next_page_number, page.previous_page_number,
+            page.start_index, page.end_index,
+        )
+        for method in methods:
+            with self.subTest(method=method.__name__):
+                with self.assertRaises(NoPageNumber):
+                    method()
+        template = Template(
+            '{{ page.start_index }}-{{ page.next_page_number }}')
+        self.assertEqual(template.render(Context({'page': page})), '-')
+
+    def test_cursor_page_runs_single_query(self):
+        """Курсорная страница читается одним запросом без COUNT(*)."""
+        paginator = CursorPaginator(
+            Post.objects.all(), settings.NUMBER_OBJECTS
+        )
+        with self.assertNumQueries(1):
+            page = paginator.cursor_page()
+        with self.assertNumQueries(1):
+            paginator.cursor_page(after=page.next_cursor)
+
+
+@override_settings(FEED_PAGE_TIMEOUT=0)
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        clear_caches()
+
+    def test_card_is_cached_after_render(self):
+        """Карточка поста попадает в кэш после отрисовки ленты."""
+        self.client.get(reverse('posts:index'))
+        self.assertIn(
+            'Тестовый пост', card_cache().get(card_key(self.post.pk)))
+
+    def test_card_invalidated_on_post_author_and_group_change(self):
+        """Правка поста, автора или группы сбрасывает карточку."""
+        post = Post.objects.get(pk=self.post.pk)
+        changes = (
+            (post, 'text', 'Новый текст'),
+            (post.author, 'first_name', 'Новое имя'),
+            (post.group, 'slug', 'new-slug'),
+        )
+        for obj, field, value in changes:
+            with self.subTest(field=field):
+                self.client.get(reverse('posts:index'))
+                setattr(obj, field, value)
+                obj.save()
+                self.assertIsNone(card_cache().get(card_key(post.pk)))
+                response = self.client.get(reverse('posts:index'))
+                self.assertContains(response, value)
+
+
+@override_settings(FEED_PAGE_TIMEOUT=60)
+class FeedPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.author}),
+        )
+
+    def setUp(self):
+        clear_caches()
+        self.guest_client = Client()
+        self.authorized_client_author = Client()
+        self.authorized_client_author.force_login(FeedPageCacheTests.author)
+
+    def test_anonymous_feed_served_from_cache(self):
+        """Повторный анонимный запрос ленты не обращается к базе."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                first = self.guest_client.get(url)
+                with self.assertNumQueries(0):
+                    second = self.guest_client.get(url)
+                self.assertEqual(first.content, second.content)
+
+    def test_new_post_makes_cached_feeds_stale(self):
+        """Новый пост сразу виден в закэшированных лентах."""
+        for url in self.urls:
+            self.guest_client.get(url)
+        self.authorized_client_author.post(
+            reverse('posts:create'),
+            data={'text': 'Свежий пост', 'group': self.group.pk},
+        )
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertContains(response, 'Свежий пост')
+
+    def test_write_in_other_process_makes_feed_stale(self):
+        """Версия ленты, поднятая другим процессом в общем кэше,
+        сбрасывает страницу из кэша этого процесса.
+        """
+        url = reverse('posts:index')
+        self.guest_client.get(url)
+        version_cache().incr(version_key('global'))
+        response = self.guest_client.get(url)
+        self.assertIsNotNone(response.context)
+
+    def test_authorized_feed_not_cached(self):
+        """Страницы для авторизованных пользователей не кэшируются."""
+        url = reverse('posts:index')
+        self.authorized_client_author.get(url)
+        response = self.authorized_client_author.get(url)
+        self.assertIsNotNone(response.context)
+
+
+class FollowViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.follower = User.objects.create_user(username='TestFollower')
+        cls.stranger = User.objects.create_user(username='TestStranger')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Старый пост автора',
+        )
+
+    def setUp(self):
+        self.follower_client = Client()
+        self.follower_client.force_login(FollowViewsTest.follower)
+        self.stranger_client = Client()
+        self.stranger_client.force_login(FollowViewsTest.stranger)
+
+    def follow(self):
+        self.follower_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': self.author}))
+
+    def home_posts(self, client):
+        response = client.get(reverse('posts:follow_index'))
+        return list(response.context['page_obj'])
+
+    def test_follow_and_unfollow(self):
+        """Пользователь подписывается и отписывается от автора,
+        но не от самого себя.
+        """
+        self.follow()
+        self.assertTrue(Follow.objects.filter(
+            user=self.follower, author=self.author).exists())
+        self.follower_client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': self.author}))
+        self.assertFalse(Follow.objects.filter(
+            user=self.follower, author=self.author).exists())
+        self.follower_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': self.follower}))
+        self.assertFalse(Follow.objects.filter(user=self.follower).exists())
+
+    def test_new_post_reaches_only_followers(self):
+        """Новый пост попадает в ленту подписчика и не попадает
+        в ленту остальных.
+        """
+        self.follow()
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertIn(post, self.home_posts(self.follower_client))
+        self.assertNotIn(post, self.home_posts(self.stranger_client))
+
+    def test_follow_backfills_and_unfollow_clears_timeline(self):
+        """Подписка добавляет старые посты автора в ленту,
+        отписка убирает их.
+        """
+        self.follow()
+        self.assertEqual(self.home_posts(self.follower_client), [self.post])
+        self.follower_client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': self.author}))
+        self.assertEqual(self.home_posts(self.follower_client), [])
+        self.assertFalse(
+            HomeTimeline.objects.filter(user=self.follower).exists())
+
+    @override_settings(FANOUT_FOLLOWERS_LIMIT=0)
+    def test_celebrity_posts_read_on_open(self):
+        """Посты популярного автора не раскладываются по лентам,
+        но видны подписчику при открытии ленты.
+        """
+        self.follow()
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertFalse(
+            HomeTimeline.objects.filter(user=self.follower).exists())
+        self.assertEqual(
+            self.home_posts(self.follower_client), [self.post, post])
+
+    @override_settings(FANOUT_FOLLOWERS_LIMIT=1)
+    def test_posts_reach_timeline_when_author_stops_being_celebrity(self):
+        """Посты, написанные, пока автор был популярным, остаются в
+        ленте подписчика, когда подписчиков становится меньше.
+        """
+        self.follow()
+        self.stranger_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': self.author}))
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertFalse(HomeTimeline.objects.filter(post=post).exists())
+        self.stranger_client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': self.author}))
+        self.assertTrue(HomeTimeline.objects.filter(
+            user=self.follower, post=post).exists())
+        self.assertEqual(
+            self.home_posts(self.follower_client), [self.post, post])
+
+
+class ExportViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug')
+        Post.objects.bulk_create([
+            Post(author=cls.author, group=cls.group, text=f'Пост, {i}')
+            for i in range(settings.AMOUNT_POSTS)
+        ])
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def export(self, url, **params):
+        response = self.authorized_client.get(url, params)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    @override_settings(EXPORT_CHUNK_SIZE=5)
+    def test_profile_export_streams_json_lines(self):
+        """Выгрузка автора отдаёт все посты строками JSON по порядку."""
+        content = self.export(
+            reverse('posts:profile_export', args=[self.author]))
+        records = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(records), settings.AMOUNT_POSTS)
+        self.assertEqual(records[0]['text'], 'Пост, 0')
+        self.assertEqual(records[0]['author'], 'TestAuthor')
+        self.assertEqual(records[0]['group'], 'test-slug')
+
+    def test_group_export_streams_csv(self):
+        """Выгрузка группы в CSV начинается с заголовка."""
+        content = self.export(
+            reverse('posts:group_export', args=[self.group.slug]),
+            format='csv')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), settings.AMOUNT_POSTS)
+        self.assertEqual(
+            rows[-1]['text'], f'Пост, {settings.AMOUNT_POSTS - 1}')
+
+    def test_unknown_export_format_is_404(self):
+        response = self.authorized_client.get(
+            reverse('posts:profile_export', args=[self.author]),
+            {'format': 'xml'})
+        self.assertEqual(response.status_code, 404)
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Тестовый пост')
+
+    def setUp(self):
+        clear_caches()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        )
+
+    def revalidate(self, client, url, response):
+        return client.get(
+            url,
+            HTTP_IF_NONE_MATCH=response['ETag'],
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+
+    def test_unchanged_pages_answer_304_without_render(self):
+        """Повторный запрос с валидаторами получает 304 без шаблонов."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertTrue(response.has_header('Last-Modified'))
+                with self.assertTemplateNotUsed('base.html'):
+                    repeated = self.revalidate(
+                        self.authorized_client, url, response)
+                self.assertEqual(repeated.status_code, 304)
+
+    def test_edit_and_delete_change_validators(self):
+        """Правка и удаление поста дают новую страницу, а не 304."""
+        responses = {
+            url: self.authorized_client.get(url) for url in self.urls}
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный пост'
+        post.save()
+        self.assertGreater(post.updated_at, post.pub_date)
+        for url, response in responses.items():
+            with self.subTest(url=url):
+                self.assertEqual(self.revalidate(
+                    self.authorized_client, url, response).status_code, 200)
+        second = Post.objects.create(author=self.author, text='Второй пост')
+        response = self.authorized_client.get(self.urls[0])
+        second.delete()
+        self.assertEqual(self.revalidate(
+            self.authorized_client, self.urls[0], response).status_code, 200)
+
+    def test_follow_changes_profile_validators(self):
+        """После подписки и отписки профиль отдаётся заново
+        с другой кнопкой, а не 304.
+        """
+        reader = User.objects.create_user(username='Reader')
+        client = Client()
+        client.force_login(reader)
+        url = self.urls[2]
+        for action in ('posts:profile_follow', 'posts:profile_unfollow'):
+            with self.subTest(action=action):
+                response = client.get(url)
+                client.get(reverse(action, args=[self.author.username]))
+                repeated = self.revalidate(client, url, response)
+                self.assertEqual(repeated.status_code, 200)
+                self.assertNotEqual(repeated.content, response.content)
+
+    @override_settings(FEED_PAGE_TIMEOUT=60)
+    def test_cached_anonymous_page_answers_304_without_queries(self):
+        guest_client = Client()
+        response = guest_client.get(self.urls[0])
+        with self.assertNumQueries(0):
+            repeated = self.revalidate(guest_client, self.urls[0], response)
+        self.assertEqual(repeated.status_code, 304)
+
+
+@override_settings(FEED_PAGE_TIMEOUT=0)
+class PostExcerptViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group,
+            text='Начало поста. ' + 'Длинное продолжение. ' * 100 + 'Конец')
+
+    def setUp(self):
+        clear_caches()
+        self.guest_client = Client()
+
+    def test_feeds_show_excerpt_without_loading_text(self):
+        """Ленты выводят анонс со ссылкой и не читают текст поста."""
+        detail_url = reverse('posts:post_detail', args=[self.post.pk])
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.guest_client.get(url)
+                self.assertContains(response, 'Начало поста.')
+                self.assertNotContains(response, 'Конец')
+                self.assertContains(response, f'href="{detail_url}"')
+                for query in queries.captured_queries:
+                    self.assertNotIn('"posts_post"."text"', query['sql'])
+        self.assertContains(self.guest_client.get(detail_url), 'Конец')
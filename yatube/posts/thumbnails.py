@@ -0,0 +1,157 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections, transaction
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_in_flight = set()
+_worker = threading.local()
+
+
+def get_executor():
+    """Общий пул потоков для нарезки картинок, создаётся по требованию."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.POST_THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails',
+            )
+        return _executor
+
+
+def pending_key(name):
+    return f'thumbnail_pending:{name}'
+
+
+def mark_pending(name):
+    """Запоминает, что миниатюр картинки name ещё нет.
+
+    Пока отметка жива, отрисовка не спрашивает хранилище ключей sorl
+    о каждом размере заново; после POST_THUMBNAIL_PENDING_TIMEOUT
+    секунд (например, если нарезка не удалась) проверка повторится.
+    """
+    caches[settings.POST_THUMBNAIL_CACHE].set(
+        pending_key(name), True, settings.POST_THUMBNAIL_PENDING_TIMEOUT)
+
+
+def is_pending(name):
+    return caches[settings.POST_THUMBNAIL_CACHE].get(
+        pending_key(name), False)
+
+
+def generate_thumbnails(name, on_done=None):
+    """Нарезает все размеры из POST_THUMBNAIL_SPECS для картинки name."""
+    _worker.active = True
+    try:
+        for geometry, options in settings.POST_THUMBNAIL_SPECS:
+            default.backend.get_thumbnail(name, geometry, **options)
+        caches[settings.POST_THUMBNAIL_CACHE].delete(pending_key(name))
+        if on_done is not None:
+            on_done()
+    except Exception:
+        logger.exception('Не удалось нарезать картинку %s', name)
+    finally:
+        _worker.active = False
+        with _executor_lock:
+            _in_flight.discard(name)
+
+
+def _run_in_pool(name, on_done):
+    try:
+        generate_thumbnails(name, on_done)
+    finally:
+        close_old_connections()
+
+
+def schedule_thumbnails(name, on_done=None):
+    """Ставит нарезку картинки в очередь пула.
+
+    При POST_THUMBNAIL_WORKERS = 0 нарезка идёт сразу в текущем потоке.
+    Если очередь заполнена, задача отбрасывается: недостающие размеры
+    будут запрошены снова при следующей отрисовке. Картинка
+    попадает в очередь только после коммита, поэтому откат
+    транзакции ничего в ней не оставляет.
+    """
+    if not name:
+        return
+    if not settings.POST_THUMBNAIL_WORKERS:
+        generate_thumbnails(name, on_done)
+        return
+
+    def submit():
+        with _executor_lock:
+            if (name in _in_flight
+                    or len(_in_flight) >= settings.POST_THUMBNAIL_QUEUE):
+                return
+            _in_flight.add(name)
+        get_executor().submit(_run_in_pool, name, on_done)
+
+    transaction.on_commit(submit)
+
+
+class NonBlockingThumbnailBackend(ThumbnailBackend):
+    """Бэкенд sorl-thumbnail, который не режет картинки при отрисовке.
+
+    Шаблон получает готовую миниатюру из хранилища ключей sorl,
+    а если её ещё нет — исходную картинку, и нарезка уходит в пул.
+    """
+
+    def _full_options(self, source, options):
+        # Повторяет сборку опций из ThumbnailBackend.get_thumbnail
+        # sorl-thumbnail 12.6 (версия закреплена в requirements.txt),
+        # чтобы имя миниатюры совпадало с тем, что создаст sorl;
+        # совпадение проверяет test_thumbnails.
+        options = dict(options)
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        return options
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        if getattr(_worker, 'active', False):
+            return super().get_thumbnail(file_, geometry_string, **options)
+        if not file_:
+            raise ValueError('falsey file_ argument in get_thumbnail()')
+        source = ImageFile(file_)
+        if is_pending(source.name):
+            return source
+        name = self._get_thumbnail_filename(
+            source, geometry_string, self._full_options(source, options))
+        cached = default.kvstore.get(ImageFile(name, default.storage))
+        if cached:
+            return cached
+        mark_pending(source.name)
+        schedule_thumbnails(source.name)
+        return source
+
+
+def srcset(image):
+    """Строка srcset из уже нарезанных размеров картинки.
+
+    Размеры, которых ещё нет в хранилище, пропускаются.
+    """
+    if not image:
+        return ''
+    candidates = []
+    for geometry, options in settings.POST_THUMBNAIL_SPECS:
+        thumbnail = default.backend.get_thumbnail(image, geometry, **options)
+        if thumbnail.name != image.name:
+            candidates.append(f'{thumbnail.url} {thumbnail.width}w')
+    return ', '.join(candidates)
@@ -0,0 +1,126 @@
+from django.conf import settings
+
+from .models import AuthorStats, Follow, HomeTimeline, Post
+from .utils import TIMELINE_KEY, CursorPaginator
+
+
+def is_celebrity(author_id):
+    """Автор со слишком большим числом подписчиков для рассылки."""
+    return AuthorStats.objects.filter(
+        author_id=author_id,
+        followers_count__gt=settings.FANOUT_FOLLOWERS_LIMIT,
+    ).exists()
+
+
+def fan_out_post(post):
+    """Раскладывает новый пост по домашним лентам подписчиков автора.
+
+    Посты популярных авторов не раскладываются: подписчики читают
+    их при открытии ленты (fan-out-on-read).
+    """
+    if is_celebrity(post.author_id):
+        return
+    follower_ids = Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True)
+    HomeTimeline.objects.bulk_create(
+        (HomeTimeline(user_id=user_id, post_id=post.pk,
+                      author_id=post.author_id, pub_date=post.pub_date)
+         for user_id in follower_ids.iterator()),
+        batch_size=settings.FANOUT_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill_follow(follow):
+    """Добавляет в ленту нового подписчика последние посты автора."""
+    if is_celebrity(follow.author_id):
+        return
+    recent = Post.objects.filter(author_id=follow.author_id).order_by(
+        '-pub_date', '-pk').values_list('pk', 'pub_date')
+    HomeTimeline.objects.bulk_create(
+        (HomeTimeline(user_id=follow.user_id, post_id=post_id,
+                      author_id=follow.author_id, pub_date=pub_date)
+         for post_id, pub_date in recent[:settings.HOME_BACKFILL_POSTS]),
+        ignore_conflicts=True,
+    )
+
+
+def backfill_former_celebrity(author_id):
+    """Раскладывает последние посты автора, который перестал быть
+    популярным, по лентам всех его подписчиков.
+
+    Пока автор был популярным, его посты не попадали в HomeTimeline,
+    а home_page перестаёт дочитывать их, как только подписчиков
+    становится не больше FANOUT_FOLLOWERS_LIMIT. Вызывается после
+    отписки; срабатывает ровно на переходе через границу.
+    """
+    dropped_to_limit = AuthorStats.objects.filter(
+        author_id=author_id,
+        followers_count=settings.FANOUT_FOLLOWERS_LIMIT,
+    ).exists()
+    if not dropped_to_limit:
+        return
+    recent = list(Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-pk').values_list(
+            'pk', 'pub_date')[:settings.HOME_BACKFILL_POSTS])
+    follower_ids = Follow.objects.filter(
+        author_id=author_id).values_list('user_id', flat=True)
+    HomeTimeline.objects.bulk_create(
+        (HomeTimeline(user_id=user_id, post_id=post_id,
+                      author_id=author_id, pub_date=pub_date)
+         for user_id in follower_ids.iterator()
+         for post_id, pub_date in recent),
+        batch_size=settings.FANOUT_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def drop_follow(follow):
+    """Убирает посты автора из ленты отписавшегося пользователя."""
+    HomeTimeline.objects.filter(
+        user_id=follow.user_id, author_id=follow.author_id).delete()
+
+
+def home_page(request, user):
+    """Страница домашней ленты пользователя.
+
+    Обычно это одно чтение диапазона из HomeTimeline; посты популярных
+    авторов дочитываются отдельным запросом и сливаются по курсору.
+    """
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    timeline = CursorPaginator(
+        user.home_timeline.select_related(
+            'post__author', 'post__group').defer('post__text'),
+        settings.NUMBER_OBJECTS,
+        TIMELINE_KEY,
+    )
+    celebrity_ids = list(Follow.objects.filter(
+        user=user,
+        author__post_stats__followers_count__gt=(
+            settings.FANOUT_FOLLOWERS_LIMIT),
+    ).values_list('author_id', flat=True))
+    if not celebrity_ids:
+        page_obj = timeline.cursor_page(after, before)
+        page_obj.object_list = [entry.post for entry in page_obj]
+        return page_obj
+
+    pulled = CursorPaginator(
+        Post.objects.filter(author_id__in=celebrity_ids)
+        .select_related('author', 'group').defer('text'),
+        settings.NUMBER_OBJECTS,
+    )
+    values, backwards = pulled.resolve(after, before)
+    entries = timeline.fetch_rows(values, backwards)
+    posts = pulled.fetch_rows(values, backwards)
+    has_more = (len(entries) > timeline.per_page
+                or len(posts) > pulled.per_page)
+    merged = {post.pk: post for post in posts}
+    for entry in entries[:timeline.per_page]:
+        merged.setdefault(entry.post_id, entry.post)
+    rows = sorted(
+        merged.values(),
+        key=lambda post: (post.pub_date, post.pk),
+        reverse=backwards,
+    )
+    return pulled.build_page(rows, values, backwards, has_more)
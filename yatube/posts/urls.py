@@ -1,14 +1,32 @@
 from django.urls import path
-from . import views
+from . import feeds, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('group/<slug:slug>/rss/', feeds.group_rss, name='group_rss'),
+    path('group/<slug:slug>/atom/', feeds.group_atom, name='group_atom'),
+    path('group/<slug:slug>/export/',
+         views.group_export, name='group_export'),
     path('', views.index, name='index'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/rss/',
+         feeds.author_rss, name='author_rss'),
+    path('profile/<str:username>/atom/',
+         feeds.author_atom, name='author_atom'),
+    path('profile/<str:username>/export/',
+         views.profile_export, name='profile_export'),
+    path('profile/<str:username>/follow/',
+         views.profile_follow, name='profile_follow'),
+    path('profile/<str:username>/unfollow/',
+         views.profile_unfollow, name='profile_unfollow'),
+    path('follow/', views.follow_index, name='follow_index'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('search/', views.search, name='search'),
+    path('rss/', feeds.latest_rss, name='rss'),
+    path('atom/', feeds.latest_atom, name='atom'),
     path('create/', views.post_create, name='create'),
     path('posts/<post_id>/edit/', views.post_edit, name='post_edit'),
 ]
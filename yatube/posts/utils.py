@@ -1,8 +1,197 @@
+import base64
+import json
+
 from django.conf import settings
-from django.core.paginator import Paginator
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db.models import Q
+
+CURSOR_KEY = ('pub_date', 'pk')
+TIMELINE_KEY = ('pub_date', 'post_id')
+
+
+def encode_cursor(values):
+    """Упаковывает значения ключа сортировки в непрозрачный токен."""
+    raw = json.dumps([str(value) for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковывает токен; для испорченного токена возвращает None."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list):
+        return None
+    return values
+
+
+class NoPageNumber(InvalidPage):
+    """У курсорной страницы нет номера и позиции в общем списке.
+
+    В шаблоне такое обращение даёт пустую строку, как и любая
+    отсутствующая переменная.
+    """
+
+    silent_variable_failure = True
+
+
+class CursorPage(Page):
+    """Страница курсорной пагинации: без номера и без общего количества.
+
+    Методы Page, которые считают номера страниц и позиции записей,
+    здесь поднимают NoPageNumber: соседние страницы открываются по
+    previous_cursor и next_cursor.
+    """
+
+    def __init__(self, object_list, paginator, previous_cursor=None,
+                 next_cursor=None):
+        super().__init__(object_list, None, paginator)
+        self.previous_cursor = previous_cursor
+        self.next_cursor = next_cursor
+
+    def __repr__(self):
+        return '<Cursor page>'
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def _no_number(self):
+        raise NoPageNumber(
+            'Курсорная страница не имеет номера, используйте курсоры')
+
+    def next_page_number(self):
+        self._no_number()
+
+    def previous_page_number(self):
+        self._no_number()
+
+    def start_index(self):
+        self._no_number()
+
+    def end_index(self):
+        self._no_number()
+
+
+class CursorPaginator(Paginator):
+    """Keyset-пагинация по ключу (pub_date, id).
+
+    Страница выбирается условием по ключу последней показанной записи,
+    поэтому не нужен ни COUNT(*), ни OFFSET.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, per_page, key=CURSOR_KEY):
+        super().__init__(object_list, per_page)
+        self.key = key
+
+    def _fields(self):
+        meta = self.object_list.model._meta
+        fields = []
+        for name in self.key:
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            field = meta.pk if name == 'pk' else meta.get_field(name)
+            fields.append((name, field, descending))
+        return fields
+
+    def _parse(self, token):
+        values = decode_cursor(token) if token else None
+        fields = self._fields()
+        if values is None or len(values) != len(fields):
+            return None
+        try:
+            return [field.to_python(value)
+                    for (_, field, _), value in zip(fields, values)]
+        except ValidationError:
+            return None
+
+    def _seek(self, values, backwards):
+        condition = Q()
+        equal = {}
+        bound = None
+        for (name, _, descending), value in zip(self._fields(), values):
+            lookup = 'lt' if descending != backwards else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+            if bound is None:
+                # Отдельная граница по первому полю ключа позволяет
+                # базе читать индекс диапазоном, а не целиком.
+                bound = Q(**{f'{name}__{lookup}e': value})
+        return bound & condition
+
+    def _ordering(self, backwards):
+        ordering = []
+        for name, _, descending in self._fields():
+            ordering.append(f'-{name}' if descending != backwards else name)
+        return ordering
+
+    def _cursor(self, obj):
+        if isinstance(obj, dict):
+            return encode_cursor(obj[name] for name, _, _ in self._fields())
+        return encode_cursor(
+            getattr(obj, name) for name, _, _ in self._fields())
+
+    def resolve(self, after=None, before=None):
+        """Разбирает курсоры запроса: (значения ключа, назад ли листать)."""
+        backwards = before is not None and after is None
+        values = self._parse(before if backwards else after)
+        if values is None:
+            backwards = False
+        return values, backwards
+
+    def fetch_rows(self, values, backwards):
+        """Читает до per_page + 1 записей после (или перед) курсором."""
+        queryset = self.object_list.order_by(*self._ordering(backwards))
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, backwards))
+        return list(queryset[:self.per_page + 1])
+
+    def build_page(self, rows, values, backwards, has_more=False):
+        """Собирает страницу из записей в порядке чтения."""
+        has_more = has_more or len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+        if not rows:
+            return CursorPage(rows, self)
+        first, last = self._cursor(rows[0]), self._cursor(rows[-1])
+        if backwards:
+            return CursorPage(
+                rows, self,
+                previous_cursor=first if has_more else None,
+                next_cursor=last if values is not None else None,
+            )
+        return CursorPage(
+            rows, self,
+            previous_cursor=first if values is not None else None,
+            next_cursor=last if has_more else None,
+        )
+
+    def cursor_page(self, after=None, before=None):
+        """Возвращает страницу после курсора after или перед before."""
+        values, backwards = self.resolve(after, before)
+        rows = self.fetch_rows(values, backwards)
+        return self.build_page(rows, values, backwards)
+
 
+def get_page(request, post_list, key=CURSOR_KEY):
+    """Постраничный вывод ленты.
 
-def get_page(request, post_list):
-    paginator = Paginator(post_list, settings.NUMBER_OBJECTS)
-    page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+    По умолчанию используется курсорная пагинация (?after=/?before=);
+    ссылки с номерами страниц (?page=) работают как раньше.
+    """
+    if 'page' in request.GET:
+        paginator = Paginator(post_list, settings.NUMBER_OBJECTS)
+        return paginator.get_page(request.GET.get('page'))
+    paginator = CursorPaginator(post_list, settings.NUMBER_OBJECTS, key)
+    return paginator.cursor_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
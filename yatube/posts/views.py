@@ -1,13 +1,26 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Post, Group
+from .models import Follow, Post
 from .forms import PostForm
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
-from .utils import get_page
+from .utils import TIMELINE_KEY, get_page
+from .counters import author_posts_count
+from .caching import cache_anonymous_page
+from .groups import get_group_or_404
+from .conditional import (author_state, conditional_page, global_state,
+                          group_state, post_state)
+from .search import SearchPaginator
+from .timeline import home_page
+from .export import CONTENT_TYPES, export_response
+from django.conf import settings
+from django.utils.http import urlencode
+from django.http import Http404
 
 
+@cache_anonymous_page('global')
+@conditional_page(global_state)
 def index(request):
-    post_list = Post.objects.select_related('group', 'author')
+    post_list = Post.objects.select_related('group', 'author').defer('text')
     page_obj = get_page(request, post_list)
     context = {
         'page_obj': page_obj,
@@ -15,10 +28,14 @@ def index(request):
     return render(request, 'posts/index.html', context)
 
 
+@cache_anonymous_page('group:{slug}')
+@conditional_page(group_state)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = Post.objects.select_related('author')
-    page_obj = get_page(request, posts)
+    group = get_group_or_404(slug)
+    timeline = group.timeline.select_related(
+        'post__author').defer('post__text')
+    page_obj = get_page(request, timeline, TIMELINE_KEY)
+    page_obj.object_list = [entry.post for entry in page_obj]
     context = {
         'group': group,
         'page_obj': page_obj
@@ -26,22 +43,53 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@cache_anonymous_page('author:{username}')
+@conditional_page(author_state)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.select_related('group')
+    author = get_object_or_404(
+        User.objects.select_related('post_stats'), username=username)
+    posts = author.posts.select_related('group').defer('text')
     page_obj = get_page(request, posts)
+    following = (
+        request.user.is_authenticated
+        and Follow.objects.filter(user=request.user, author=author).exists()
+    )
     context = {
         'author': author,
+        'following': following,
         'posts': posts,
-        'posts_count': len(posts),
+        'posts_count': author_posts_count(author),
         'page_obj': page_obj,
     }
     return render(request, 'posts/profile.html', context)
 
 
+def export_format(request):
+    export_format = request.GET.get('format', 'jsonl')
+    if export_format not in CONTENT_TYPES:
+        raise Http404('Неизвестный формат выгрузки')
+    return export_format
+
+
+@login_required
+def profile_export(request, username):
+    author = get_object_or_404(User, username=username)
+    return export_response(
+        author.posts.all(), export_format(request), f'posts-{username}')
+
+
+@login_required
+def group_export(request, slug):
+    group = get_group_or_404(slug)
+    return export_response(
+        group.posts.all(), export_format(request), f'group-{slug}')
+
+
+@conditional_page(post_state)
 def post_detail(request, post_id):
-    post = Post.objects.get(pk=post_id)
-    count = Post.objects.filter(author=post.author).count()
+    post = Post.objects.select_related(
+        'author__post_stats', 'group').get(pk=post_id)
+    count = author_posts_count(post.author)
     context = {
         'post_id': post_id,
         'count': count,
@@ -50,9 +98,24 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    paginator = SearchPaginator(query, settings.NUMBER_OBJECTS)
+    page_obj = paginator.cursor_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'extra_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
@@ -69,7 +132,11 @@ def post_edit(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     if request.user != post.author:
         return redirect("posts:post_detail", post_id)
-    form = PostForm(request.POST or None, instance=post)
+    form = PostForm(
+        request.POST or None,
+        files=request.FILES or None,
+        instance=post
+    )
     # groups = Group.objects.all()
     if form.is_valid():
         form.save()
@@ -79,3 +146,29 @@ def post_edit(request, post_id):
         'form': form,
     }
     return render(request, "posts/create_post.html", context)
+
+
+@login_required
+def follow_index(request):
+    page_obj = home_page(request, request.user)
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/follow.html', context)
+
+
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('posts:profile', username=username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    follow = Follow.objects.filter(user=request.user, author=author).first()
+    if follow is not None:
+        follow.delete()
+    return redirect('posts:profile', username=username)
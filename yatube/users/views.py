@@ -1,6 +1,9 @@
 from django.views.generic import CreateView
 from django.contrib.auth.views import PasswordChangeView
 from django.urls import reverse_lazy
+
+from core.auth import forget_user
+
 from .forms import CreationForm
 
 
@@ -13,3 +16,9 @@ class SignUp(CreateView):
 class ChangePassword(PasswordChangeView):
     template_name = 'users/password_change_form.html'
     success_url = reverse_lazy('users:PasswordChangeDone')
+
+    def form_valid(self, form):
+        # Старая версия пароля сбрасывается до его смены: другие сессии
+        # с этой версией не должны получить пользователя из кеша.
+        forget_user(form.user)
+        return super().form_valid(form)
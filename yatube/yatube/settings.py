@@ -46,11 +46,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.QueryBudgetMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
+    'core.middleware.TemplateTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
+    'core.middleware.ThrottleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -59,12 +63,27 @@ ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
+YATUBE_TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+# Вне отладки скомпилированные шаблоны кэшируются и разбираются
+# заранее при старте, а не на первом запросе после выкладки.
+TEMPLATE_PRELOAD = not DEBUG
+if TEMPLATE_PRELOAD:
+    YATUBE_TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', YATUBE_TEMPLATE_LOADERS),
+    ]
+# Время отрисовки шаблонов в заголовке Server-Timing и логе;
+# по умолчанию только при отладке.
+TEMPLATE_TIMING = DEBUG
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': YATUBE_TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -82,12 +101,81 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# core.db_backends.sqlite3 включает WAL и PRAGMA для нагрузки
+# и выстраивает записи в очередь; PRAGMA переопределяются через
+# OPTIONS['pragmas'].
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.db_backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
+    }
+}
+
+# Реплика для чтения лент включается переменной окружения с путём
+# к её файлу, например YATUBE_REPLICA_DB=db_replica.sqlite3; локально
+# её копирует с основной базы команда sync_replica.
+REPLICA_DB_PATH = os.environ.get('YATUBE_REPLICA_DB')
+REPLICA_DATABASE = 'replica' if REPLICA_DB_PATH else None
+if REPLICA_DATABASE:
+    DATABASES[REPLICA_DATABASE] = {
+        'ENGINE': 'core.db_backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, REPLICA_DB_PATH),
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
     }
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+REPLICA_VIEWS = (
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'api:posts',
+    'api:group_posts',
+    'api:author_posts',
+    'api:post_detail',
+)
+# Приложения, модели которых всегда читаются с основной базы,
+# а записи в них не закрепляют пользователя за ней.
+REPLICA_PRIMARY_APPS = ('auth', 'contenttypes', 'sessions', 'thumbnail')
+# Сколько секунд после записи пользователь читает с основной базы.
+REPLICA_PIN_SECONDS = 10
+
+# 'default' — кеш процесса для того, что можно потерять или пересчитать.
+# 'shared' — кеш, общий для всех процессов: лимиты запросов и то, что
+# должно сбрасываться сразу везде. В бою это memcached по адресу из
+# YATUBE_MEMCACHED (нужен пакет python-memcached), без него — файловый
+# кеш в SHARED_CACHE_DIR, общий для процессов одной машины.
+MEMCACHED_LOCATION = os.environ.get('YATUBE_MEMCACHED')
+SHARED_CACHE_DIR = os.environ.get(
+    'YATUBE_SHARED_CACHE_DIR', os.path.join(BASE_DIR, 'shared_cache'))
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': SHARED_CACHE_DIR,
+    },
 }
+if MEMCACHED_LOCATION:
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': MEMCACHED_LOCATION,
+    }
+# Тесты подменяют 'shared' чистым кешем на время прогона.
+TEST_RUNNER = 'core.test_runner.TestRunner'
+
+# Сессии живут в общем кеше с записью в базу, а перед кешем стоит
+# небольшой LRU-кеш процесса с коротким временем жизни.
+SESSION_ENGINE = 'core.sessions'
+SESSION_CACHE_ALIAS = 'shared'
+SESSION_FRONT_CACHE_SIZE = 1000
+SESSION_FRONT_CACHE_TIMEOUT = 5
+# Пользователь сессии кешируется по id и версии пароля в общем кеше,
+# чтобы смену пароля и отключение пользователя сразу видели все процессы.
+AUTH_USER_CACHE = 'shared'
+AUTH_USER_CACHE_TIMEOUT = 60 * 5
 
 
 # Password validation
@@ -133,10 +221,112 @@ STATICFILES_DIRS = (
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма ставятся в очередь со спулом на диске и отправляются фоновым
+# потоком пачками через бэкенд QUEUED_EMAIL_BACKEND (в бою — smtp).
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+QUEUED_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+QUEUED_EMAIL_SPOOL = os.path.join(BASE_DIR, 'mail_spool')
+QUEUED_EMAIL_BATCH_SIZE = 50
+QUEUED_EMAIL_MAX_RETRIES = 5
+# Пауза перед первым повтором в секундах, дальше удваивается.
+QUEUED_EMAIL_RETRY_DELAY = 30
 NUMBER_OBJECTS = 10
 AMOUNT_POSTS = 13
 LEN_PAGE_OBJ = 3
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Карточки сбрасываются сигналами при правке поста, автора или группы,
+# поэтому их кеш общий: иначе остальные процессы отдавали бы старые
+# карточки до POST_CARD_TIMEOUT.
+POST_CARD_CACHE = 'shared'
+POST_CARD_TIMEOUT = 60 * 60 * 24
+# Страницы лент хранятся в кэше процесса, а их версии — в общем,
+# чтобы новый пост или правка сразу устаревали во всех процессах.
+FEED_PAGE_CACHE = 'default'
+FEED_VERSION_CACHE = 'shared'
+# Сколько секунд хранятся страницы лент для анонимов (0 — не кэшировать).
+FEED_PAGE_TIMEOUT = 60
+# Версия реестра групп (posts.groups) должна быть общей для всех
+# процессов, иначе они не узнают о новых и удалённых группах.
+GROUP_REGISTRY_CACHE = 'shared'
+# RSS и Atom отдают SYNDICATION_ITEMS последних постов и хранятся
+# в кэше процесса под версией ленты из общего FEED_VERSION_CACHE:
+# запись в любом процессе сразу их сбрасывает, поэтому срок может
+# быть долгим.
+SYNDICATION_ITEMS = 20
+SYNDICATION_TIMEOUT = 60 * 60
+# Наибольший размер страницы JSON API (?limit=).
+API_MAX_LIMIT = 100
+# Посты авторов с большим числом подписчиков не раскладываются
+# по домашним лентам, а дочитываются при открытии ленты.
+FANOUT_FOLLOWERS_LIMIT = 1000
+FANOUT_BATCH_SIZE = 500
+HOME_BACKFILL_POSTS = 100
+
+# Миниатюры картинок постов нарезаются при загрузке, а не при отрисовке.
+THUMBNAIL_BACKEND = 'posts.thumbnails.NonBlockingThumbnailBackend'
+POST_THUMBNAIL_SPECS = (
+    ('960x339', {'crop': 'center', 'upscale': True}),
+    ('480x170', {'crop': 'center', 'upscale': True}),
+    ('1920x678', {'crop': 'center', 'upscale': True}),
+)
+POST_THUMBNAIL_WORKERS = 2
+POST_THUMBNAIL_QUEUE = 100
+# Картинка без миниатюр отмечается в кеше, чтобы отрисовка не искала
+# каждый размер в хранилище sorl заново, пока идёт нарезка.
+POST_THUMBNAIL_CACHE = 'default'
+POST_THUMBNAIL_PENDING_TIMEOUT = 60
+# Сколько строк выгрузка постов читает из базы за раз.
+EXPORT_CHUNK_SIZE = 2000
+# Лимиты пишущих запросов по имени URL: корзина токенов на пользователя
+# и на адрес клиента, '10/m' — не больше 10 запросов подряд, дальше
+# по одному раз в 6 секунд. Счётчики живут в кеше THROTTLE_CACHE, общем
+# для всех процессов, иначе каждый процесс считал бы лимит заново.
+THROTTLE_CACHE = 'shared'
+THROTTLE_RATES = {
+    'posts:create': {'user': '10/m', 'ip': '30/m'},
+    'posts:post_edit': {'user': '30/m', 'ip': '60/m'},
+    'users:signup': {'ip': '5/h'},
+}
+
+# Наибольшее число SQL-запросов на страницу для авторизованного
+# пользователя (вместе с чтением сессии и пользователя, запросом
+# для ETag/Last-Modified и COUNT(*) при листании по номерам страниц).
+SQL_QUERY_BUDGETS = {
+    'posts:index': 5,
+    'posts:group_list': 6,
+    'posts:profile': 7,
+    'posts:post_detail': 4,
+    'posts:follow_index': 4,
+    'posts:search': 4,
+    'posts:create': 3,
+    'posts:post_edit': 5,
+    'api:posts': 4,
+    'api:group_posts': 5,
+    'api:author_posts': 5,
+    'api:post_detail': 4,
+}
+# Статистика SQL по запросам пишется в лог yatube.sql: INFO для всех
+# запросов, WARNING при превышении бюджета.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'yatube.sql': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'yatube.templates': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}